@@ -3,26 +3,156 @@
 Check GitHub Actions CI/CD Pipeline Status
 """
 
-import json
+import asyncio
+import os
+import random
 import sys
-from urllib.request import urlopen, Request
-from urllib.error import HTTPError
+import tempfile
 import time
 
-def check_github_actions():
+import aiohttp
+import orjson
+
+# 재시도 설정 (지수 백오프)
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 1.0
+MAX_RATE_LIMIT_WAIT = 60  # Rate limit 대기 상한 (초)
+
+# 확인할 최근 실행 개수 (API에서도 이 개수만 요청)
+RECENT_RUN_COUNT = 5
+
+# (status, conclusion)별 상태 아이콘, 매칭이 없으면 status 기준 기본 아이콘 사용
+STATUS_ICONS = {
+    ('completed', 'success'): "✅",
+    ('completed', 'failure'): "❌",
+    ('completed', 'cancelled'): "⚠️",
+}
+DEFAULT_STATUS_ICONS = {
+    'completed': "❓",
+    'in_progress': "🔄",
+}
+PENDING_ICON = "⏳"
+
+# 조건부 요청(ETag)용 캐시 - 304 응답은 API 쿼터를 소모하지 않음
+CACHE_FILE = os.path.join(tempfile.gettempdir(), "ai_trading_bot_ci_status.json")
+
+def load_cache() -> dict:
+    """마지막 응답의 ETag와 데이터 로드"""
+    try:
+        with open(CACHE_FILE, "rb") as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+
+def save_cache(url: str, etag: str, data: dict):
+    """ETag와 응답 데이터 저장"""
+    try:
+        with open(CACHE_FILE, "wb") as f:
+            f.write(orjson.dumps({"url": url, "etag": etag, "data": data}))
+    except OSError:
+        pass
+
+def trim_workflow_runs(data: dict) -> dict:
+    """출력에 필요한 최근 실행과 필드만 남김 (캐시 크기 및 메모리 절감)"""
+    runs = []
+    for run in data.get('workflow_runs', [])[:RECENT_RUN_COUNT]:
+        head_commit = run.get('head_commit') or {}
+        runs.append({
+            'status': run['status'],
+            'conclusion': run.get('conclusion'),
+            'created_at': run['created_at'],
+            'head_branch': run['head_branch'],
+            'head_commit': {'message': head_commit.get('message', '')},
+            'run_number': run['run_number'],
+            'html_url': run['html_url'],
+        })
+    return {'workflow_runs': runs}
+
+def get_backoff_delay(attempt: int) -> float:
+    """지터가 포함된 지수 백오프 대기 시간"""
+    return RETRY_BASE_DELAY * (2 ** attempt) + random.uniform(0, RETRY_BASE_DELAY)
+
+def is_rate_limited(status: int, headers) -> bool:
+    """Rate limit 응답 여부 (rate limit 헤더 없는 403은 인증/권한 문제)"""
+    if status == 429:
+        return True
+    headers = headers or {}
+    return status == 403 and (
+        'Retry-After' in headers or headers.get('X-RateLimit-Remaining') == '0'
+    )
+
+def get_rate_limit_delay(response: aiohttp.ClientResponse, attempt: int):
+    """Rate limit 응답의 대기 시간 계산 (rate limit이 아니면 None)"""
+    headers = response.headers
+    if not is_rate_limited(response.status, headers):
+        return None
+    
+    retry_after = headers.get('Retry-After')
+    reset = headers.get('X-RateLimit-Reset')
+    
+    if retry_after and retry_after.isdigit():
+        delay = int(retry_after)
+    elif reset and reset.isdigit():
+        delay = max(0.0, int(reset) - time.time())
+    else:
+        delay = 0.0
+    
+    return min(delay, MAX_RATE_LIMIT_WAIT) + get_backoff_delay(attempt)
+
+async def fetch_workflow_runs(session: aiohttp.ClientSession, api_url: str) -> dict:
+    """워크플로우 실행 목록 조회 (일시적 오류 시 지수 백오프 재시도)"""
+    cache = load_cache()
+    request_headers = {}
+    if cache.get("url") == api_url and cache.get("etag"):
+        request_headers['If-None-Match'] = cache["etag"]
+    
+    for attempt in range(MAX_RETRIES):
+        try:
+            async with session.get(api_url, headers=request_headers) as response:
+                if response.status == 304:
+                    return cache["data"]
+                
+                if response.status in (403, 429) and attempt < MAX_RETRIES - 1:
+                    delay = get_rate_limit_delay(response, attempt)
+                    if delay is not None:
+                        print(f"⏳ GitHub API rate limit - {delay:.1f}초 후 재시도합니다.")
+                        await asyncio.sleep(delay)
+                        continue
+                
+                response.raise_for_status()
+                data = trim_workflow_runs(orjson.loads(await response.read()))
+                
+                etag = response.headers.get('ETag')
+                if etag:
+                    save_cache(api_url, etag, data)
+                return data
+        except aiohttp.ClientResponseError as e:
+            # 4xx는 재시도해도 결과가 같으므로 즉시 전달
+            if e.status < 500 or attempt == MAX_RETRIES - 1:
+                raise
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == MAX_RETRIES - 1:
+                raise
+        
+        await asyncio.sleep(get_backoff_delay(attempt))
+
+async def check_github_actions():
     """GitHub Actions 워크플로우 상태 확인"""
     
     repo = "JiHyunSim/ai-trading-bot"
-    api_url = f"https://api.github.com/repos/{repo}/actions/runs"
+    api_url = f"https://api.github.com/repos/{repo}/actions/runs?per_page={RECENT_RUN_COUNT}"
+    headers = {
+        'Accept': 'application/vnd.github.v3+json',
+        'User-Agent': 'AI-Trading-Bot-CI-Checker'
+    }
     
     try:
         # GitHub API 호출
-        request = Request(api_url)
-        request.add_header('Accept', 'application/vnd.github.v3+json')
-        request.add_header('User-Agent', 'AI-Trading-Bot-CI-Checker')
-        
-        with urlopen(request, timeout=10) as response:
-            data = json.loads(response.read().decode())
+        async with aiohttp.ClientSession(
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=10)
+        ) as session:
+            data = await fetch_workflow_runs(session, api_url)
             
         runs = data.get('workflow_runs', [])
         
@@ -33,35 +163,29 @@ def check_github_actions():
         print("🔍 최근 GitHub Actions 실행 상태:")
         print("=" * 70)
         
-        for i, run in enumerate(runs[:5]):  # 최근 5개 실행만 확인
+        for i, run in enumerate(runs[:RECENT_RUN_COUNT]):  # 최근 실행만 확인
             status = run['status']
             conclusion = run.get('conclusion', 'N/A')
             created_at = run['created_at']
             branch = run['head_branch']
             commit_message = run['head_commit']['message'].split('\n')[0]
             
+            run_number = run['run_number']
+            html_url = run['html_url']
+            
             # 상태 아이콘
-            if status == 'completed':
-                if conclusion == 'success':
-                    icon = "✅"
-                elif conclusion == 'failure':
-                    icon = "❌"
-                elif conclusion == 'cancelled':
-                    icon = "⚠️"
-                else:
-                    icon = "❓"
-            elif status == 'in_progress':
-                icon = "🔄"
-            else:
-                icon = "⏳"
+            icon = STATUS_ICONS.get(
+                (status, conclusion),
+                DEFAULT_STATUS_ICONS.get(status, PENDING_ICON)
+            )
             
-            print(f"{icon} #{run['run_number']} - {status.upper()}")
+            print(f"{icon} #{run_number} - {status.upper()}")
             if conclusion != 'N/A':
                 print(f"   결과: {conclusion.upper()}")
             print(f"   브랜치: {branch}")
             print(f"   커밋: {commit_message[:60]}{'...' if len(commit_message) > 60 else ''}")
             print(f"   시간: {created_at}")
-            print(f"   URL: {run['html_url']}")
+            print(f"   URL: {html_url}")
             print()
         
         # 가장 최근 실행 결과 체크
@@ -80,9 +204,13 @@ def check_github_actions():
                 print(f"   결과: {latest_run['conclusion']}")
             return False
             
-    except HTTPError as e:
-        if e.code == 404:
+    except aiohttp.ClientResponseError as e:
+        if e.status == 404:
             print("❌ 저장소를 찾을 수 없거나 접근 권한이 없습니다.")
+        elif is_rate_limited(e.status, e.headers):
+            print("❌ GitHub API rate limit을 초과했습니다. 잠시 후 다시 시도하세요.")
+        elif e.status in (401, 403):
+            print("❌ GitHub API 인증 또는 접근 권한 오류입니다. 토큰과 저장소 권한을 확인하세요.")
         else:
             print(f"❌ GitHub API 호출 실패: {e}")
         return False
@@ -93,7 +221,7 @@ def check_github_actions():
 def main():
     print("🚀 GitHub Actions CI/CD 파이프라인 상태 확인\n")
     
-    success = check_github_actions()
+    success = asyncio.run(check_github_actions())
     
     if success:
         print("\n✅ CI/CD 파이프라인 검증 완료!")
@@ -5,15 +5,19 @@ Redis 큐, 수집 상태, 데이터 처리율을 실시간으로 모니터링합
 """
 
 import asyncio
-import json
+import io
 import os
 import sys
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 
 import aiohttp
+import orjson
 import redis.asyncio as redis
 import structlog
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
 
 # 로깅 설정
 structlog.configure(
@@ -29,6 +33,93 @@ structlog.configure(
 
 logger = structlog.get_logger(__name__)
 
+# 컬렉터 상태 Hash 키 (필드: 심볼, 값: 상태 JSON)
+STATUS_HASH_KEY = "status"
+
+# last_update가 이보다 오래된 상태는 종료/중단된 컬렉터로 보고 제외 (컬렉터의 STATUS_TTL_SECONDS와 동일)
+STATUS_TTL_SECONDS = 300
+
+# 처리율 계산 윈도우 (초) - 프로세서가 기록하는 rate:<counter>:<epoch_sec> 버킷 사용
+RATE_WINDOW_SECONDS = 10
+
+# 큐 길이, 카운터, 처리율 버킷 합계, 컬렉터 상태를 한 번에 조회하는 스크립트
+# KEYS: queue, processed_count, error_count, status hash, processed 버킷 N개, error 버킷 N개
+# ARGV: 버킷 개수 N
+SNAPSHOT_SCRIPT = """
+local window = tonumber(ARGV[1])
+local processed_sum = 0
+local error_sum = 0
+for i = 1, window do
+    processed_sum = processed_sum + tonumber(redis.call('GET', KEYS[4 + i]) or 0)
+    error_sum = error_sum + tonumber(redis.call('GET', KEYS[4 + window + i]) or 0)
+end
+return {
+    redis.call('LLEN', KEYS[1]),
+    redis.call('GET', KEYS[2]) or '0',
+    redis.call('GET', KEYS[3]) or '0',
+    processed_sum,
+    error_sum,
+    redis.call('HGETALL', KEYS[4])
+}
+"""
+
+# Keyspace 알림 기반 갱신 설정
+KEYSPACE_EVENT_FLAGS = "Klh"        # keyspace 이벤트 + list/hash 명령
+KEYSPACE_IDLE_POLL_SECONDS = 30     # 이벤트가 없을 때 liveness 폴링 주기
+KEYSPACE_READ_TIMEOUT = 10.0        # 구독 읽기 대기 시간 (만료는 정상 유휴 상태로 처리)
+
+# ANSI 커서 홈 + 화면 지우기
+CLEAR_SCREEN = "\x1b[H\x1b[J"
+
+
+# 상태 JSON이 키당 평균 이 크기(바이트)를 넘으면 디코딩을 스레드 풀에서 수행
+STATUS_DECODE_OFFLOAD_BYTES = 4096
+
+
+def parse_status_time(value) -> Optional[datetime]:
+    """상태의 last_update를 naive UTC datetime으로 변환 (형식이 잘못되면 None)"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def decode_statuses(raw_statuses: List[str]) -> Dict:
+    """HGETALL 결과([field, value, ...])의 상태 JSON 디코딩 (오래되거나 잘못된 상태는 제외)"""
+    cutoff = datetime.utcnow() - timedelta(seconds=STATUS_TTL_SECONDS)
+    statuses = {}
+    for symbol, status_data in zip(raw_statuses[::2], raw_statuses[1::2]):
+        if not status_data:
+            continue
+        
+        # 항목 하나가 잘못되어도 나머지 상태와 큐 통계는 그대로 표시
+        try:
+            status = orjson.loads(status_data)
+            last_update = parse_status_time(status.get("last_update"))
+        except (orjson.JSONDecodeError, AttributeError):
+            logger.warning(f"Invalid status in field {symbol}")
+            continue
+        
+        if last_update is not None and last_update >= cutoff:
+            statuses[symbol] = status
+    return statuses
+
+
+def format_uptime(seconds: int) -> str:
+    """업타임을 읽기 좋은 형식으로 변환"""
+    if seconds < 60:
+        return f"{seconds}s"
+    elif seconds < 3600:
+        return f"{seconds//60}m {seconds%60}s"
+    else:
+        hours = seconds // 3600
+        minutes = (seconds % 3600) // 60
+        return f"{hours}h {minutes}m"
+
 
 class CollectionMonitor:
     """실시간 데이터 수집 모니터링"""
@@ -45,9 +136,13 @@ class CollectionMonitor:
         self.gateway_host = gateway_host
         self.gateway_port = gateway_port
         self.redis_client = None
+        self.http_session: Optional[aiohttp.ClientSession] = None
+        self.snapshot_script = None
+        
+        # CONFIG SET으로 바꾼 경우 종료 시 복원할 notify-keyspace-events 원래 값
+        self.previous_keyspace_events: Optional[str] = None
         
         # 모니터링 데이터
-        self.previous_stats = {}
         self.start_time = datetime.now()
     
     async def connect_redis(self):
@@ -58,10 +153,18 @@ class CollectionMonitor:
                 port=self.redis_port,
                 password=self.redis_password,
                 decode_responses=True,
-                retry_on_timeout=True
+                socket_timeout=2,
+                socket_keepalive=True,
+                health_check_interval=30,
+                # 연결/타임아웃 오류 시 지수 백오프로 최대 3회 재시도
+                retry=Retry(ExponentialBackoff(cap=2, base=0.1), 3)
             )
             
             await self.redis_client.ping()
+            
+            # 스냅샷 스크립트 등록 (EVALSHA 사용, 스크립트 캐시 유실 시 자동 재로드)
+            self.snapshot_script = self.redis_client.register_script(SNAPSHOT_SCRIPT)
+            
             logger.info("Redis connection established for monitoring")
             return True
             
@@ -69,171 +172,166 @@ class CollectionMonitor:
             logger.error(f"Failed to connect to Redis: {e}")
             return False
     
-    async def get_queue_stats(self) -> Dict:
-        """Redis 큐 통계 조회"""
+    async def get_redis_snapshot(self) -> Tuple[Dict, Dict]:
+        """큐 통계와 컬렉터 상태를 하나의 원자적 스냅샷으로 조회"""
         try:
-            # 캔들 데이터 큐 길이
-            queue_length = await self.redis_client.llen("candle_data_queue")
-            
-            # 처리 완료 카운터 (있는 경우)
-            processed_count = await self.redis_client.get("processed_count") or "0"
+            # 직전 윈도우의 완료된 초 단위 버킷
+            now_sec = int(time.time())
+            buckets = range(now_sec - RATE_WINDOW_SECONDS, now_sec)
+            keys = [
+                "candle_data_queue", "processed_count", "error_count", STATUS_HASH_KEY,
+                *[f"rate:processed_count:{sec}" for sec in buckets],
+                *[f"rate:error_count:{sec}" for sec in buckets]
+            ]
             
-            # 에러 카운터
-            error_count = await self.redis_client.get("error_count") or "0"
+            # Lua 스크립트(EVALSHA)로 1회 라운드트립 + 서버 측 원자적 조회
+            (queue_length, processed_count, error_count, processed_sum, error_sum,
+             raw_statuses) = await self.snapshot_script(keys=keys, args=[RATE_WINDOW_SECONDS])
             
-            return {
+            queue_stats = {
                 "queue_length": queue_length,
                 "processed_count": int(processed_count),
                 "error_count": int(error_count),
+                "processing_rate": processed_sum / RATE_WINDOW_SECONDS,
+                "error_rate": error_sum / RATE_WINDOW_SECONDS,
                 "timestamp": datetime.now().isoformat()
             }
             
         except Exception as e:
-            logger.error(f"Failed to get queue stats: {e}")
-            return {}
+            logger.error(f"Failed to get Redis snapshot: {e}")
+            return {}, {}
+        
+        # 큰 상태 페이로드는 이벤트 루프를 막지 않도록 스레드 풀에서 일괄 디코딩
+        status_count = len(raw_statuses) // 2
+        payload_size = sum(len(value or "") for value in raw_statuses[1::2])
+        if status_count and payload_size > STATUS_DECODE_OFFLOAD_BYTES * status_count:
+            loop = asyncio.get_running_loop()
+            statuses = await loop.run_in_executor(None, decode_statuses, raw_statuses)
+        else:
+            statuses = decode_statuses(raw_statuses)
+        
+        return queue_stats, statuses
     
-    async def get_collector_statuses(self) -> Dict:
-        """모든 컬렉터 상태 조회"""
-        try:
-            collector_keys = await self.redis_client.keys("status:*")
-            statuses = {}
-            
-            for key in collector_keys:
-                symbol = key.split(":", 1)[1]
-                status_data = await self.redis_client.get(key)
-                
-                if status_data:
-                    try:
-                        statuses[symbol] = json.loads(status_data)
-                    except json.JSONDecodeError:
-                        logger.warning(f"Invalid JSON in status key {key}")
-            
-            return statuses
-            
-        except Exception as e:
-            logger.error(f"Failed to get collector statuses: {e}")
-            return {}
+    def get_http_session(self) -> aiohttp.ClientSession:
+        """Gateway 조회용 HTTP 세션 반환 (keep-alive 연결 재사용)"""
+        if self.http_session is None or self.http_session.closed:
+            self.http_session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=5),
+                connector=aiohttp.TCPConnector(
+                    limit=100,                # 전체 연결 풀 상한
+                    limit_per_host=20,        # 호스트별 keep-alive 연결 상한
+                    keepalive_timeout=60,
+                    ttl_dns_cache=300         # 매 조회마다 DNS 재조회 방지
+                )
+            )
+        return self.http_session
     
     async def get_subscription_info(self) -> List[Dict]:
         """Gateway를 통한 구독 정보 조회"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"http://{self.gateway_host}:{self.gateway_port}/api/v1/subscriptions",
-                    timeout=aiohttp.ClientTimeout(total=5)
-                ) as response:
+            session = self.get_http_session()
+            async with session.get(
+                f"http://{self.gateway_host}:{self.gateway_port}/api/v1/subscriptions"
+            ) as response:
+                
+                if response.status == 200:
+                    result = await response.json(loads=orjson.loads)
+                    return result.get("subscriptions", [])
+                else:
+                    return []
                     
-                    if response.status == 200:
-                        result = await response.json()
-                        return result.get("subscriptions", [])
-                    else:
-                        return []
-                        
         except Exception as e:
             logger.debug(f"Failed to get subscription info: {e}")
             return []
     
-    async def calculate_processing_rate(self, current_stats: Dict) -> Dict:
-        """데이터 처리율 계산"""
-        rates = {}
-        current_time = datetime.now()
-        
-        if self.previous_stats:
-            time_diff = (current_time - self.previous_stats.get("timestamp", current_time)).total_seconds()
-            
-            if time_diff > 0:
-                # 처리율 계산 (messages per second)
-                processed_diff = current_stats.get("processed_count", 0) - self.previous_stats.get("processed_count", 0)
-                rates["processing_rate"] = processed_diff / time_diff
-                
-                # 에러율 계산
-                error_diff = current_stats.get("error_count", 0) - self.previous_stats.get("error_count", 0)
-                rates["error_rate"] = error_diff / time_diff
-        
-        # 이전 통계 업데이트
-        self.previous_stats = current_stats.copy()
-        self.previous_stats["timestamp"] = current_time
+    def calculate_processing_rate(self, current_stats: Dict) -> Dict:
+        """데이터 처리율 (Redis 초 단위 버킷 기반, 초당 평균)"""
+        if not current_stats:
+            return {}
         
-        return rates
-    
-    def format_uptime(self, seconds: int) -> str:
-        """업타임을 읽기 좋은 형식으로 변환"""
-        if seconds < 60:
-            return f"{seconds}s"
-        elif seconds < 3600:
-            return f"{seconds//60}m {seconds%60}s"
-        else:
-            hours = seconds // 3600
-            minutes = (seconds % 3600) // 60
-            return f"{hours}h {minutes}m"
+        return {
+            "processing_rate": current_stats.get("processing_rate", 0),
+            "error_rate": current_stats.get("error_rate", 0)
+        }
     
     def print_status_report(self, queue_stats: Dict, collector_statuses: Dict, 
-                           subscriptions: List[Dict], rates: Dict):
+                           subscriptions: List[Dict], rates: Dict,
+                           now: Optional[datetime] = None):
         """상태 리포트 출력"""
-        print("\n" + "="*80)
-        print(f"🚀 BTC-USDT Collection Monitor - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print("="*80)
+        now = now or datetime.now()
+        
+        # 리포트 전체를 버퍼에 모아 한 번의 write로 출력
+        out = io.StringIO()
+        
+        print("\n" + "="*80, file=out)
+        print(f"🚀 BTC-USDT Collection Monitor - {now.strftime('%Y-%m-%d %H:%M:%S')}", file=out)
+        print("="*80, file=out)
         
         # 전체 업타임
-        monitor_uptime = (datetime.now() - self.start_time).total_seconds()
-        print(f"📊 Monitor Uptime: {self.format_uptime(int(monitor_uptime))}")
+        monitor_uptime = (now - self.start_time).total_seconds()
+        print(f"📊 Monitor Uptime: {format_uptime(int(monitor_uptime))}", file=out)
         
         # Redis 큐 상태
-        print("\n📦 REDIS QUEUE STATUS")
-        print("-"*40)
+        print("\n📦 REDIS QUEUE STATUS", file=out)
+        print("-"*40, file=out)
         if queue_stats:
-            print(f"Queue Length: {queue_stats.get('queue_length', 0):,} messages")
-            print(f"Processed: {queue_stats.get('processed_count', 0):,} total")
-            print(f"Errors: {queue_stats.get('error_count', 0):,} total")
+            print(f"Queue Length: {queue_stats.get('queue_length', 0):,} messages", file=out)
+            print(f"Processed: {queue_stats.get('processed_count', 0):,} total", file=out)
+            print(f"Errors: {queue_stats.get('error_count', 0):,} total", file=out)
             
             if rates:
-                print(f"Processing Rate: {rates.get('processing_rate', 0):.2f} msg/sec")
-                print(f"Error Rate: {rates.get('error_rate', 0):.2f} err/sec")
+                print(f"Processing Rate: {rates.get('processing_rate', 0):.2f} msg/sec", file=out)
+                print(f"Error Rate: {rates.get('error_rate', 0):.2f} err/sec", file=out)
         else:
-            print("❌ Unable to get queue statistics")
+            print("❌ Unable to get queue statistics", file=out)
         
         # 구독 정보
-        print("\n📡 ACTIVE SUBSCRIPTIONS")
-        print("-"*40)
+        print("\n📡 ACTIVE SUBSCRIPTIONS", file=out)
+        print("-"*40, file=out)
         if subscriptions:
             for sub in subscriptions:
                 symbol = sub.get("symbol", "Unknown")
                 timeframes = sub.get("timeframes", [])
                 status = sub.get("status", "unknown")
-                print(f"Symbol: {symbol}")
-                print(f"  Status: {status}")
-                print(f"  Timeframes: {', '.join(timeframes)}")
+                print(f"Symbol: {symbol}", file=out)
+                print(f"  Status: {status}", file=out)
+                print(f"  Timeframes: {', '.join(timeframes)}", file=out)
         else:
-            print("❌ No active subscriptions found")
+            print("❌ No active subscriptions found", file=out)
         
         # 컬렉터 상태
-        print("\n🔌 COLLECTOR STATUS")
-        print("-"*40)
+        print("\n🔌 COLLECTOR STATUS", file=out)
+        print("-"*40, file=out)
         if collector_statuses:
             for symbol, status in collector_statuses.items():
                 is_connected = status.get("is_connected", False)
                 connection_status = "🟢 Connected" if is_connected else "🔴 Disconnected"
                 
-                print(f"Symbol: {symbol}")
-                print(f"  Connection: {connection_status}")
-                print(f"  Messages: {status.get('message_count', 0):,}")
-                print(f"  Errors: {status.get('error_count', 0):,}")
-                print(f"  Reconnects: {status.get('reconnect_count', 0)}")
+                print(f"Symbol: {symbol}", file=out)
+                print(f"  Connection: {connection_status}", file=out)
+                print(f"  Messages: {status.get('message_count', 0):,}", file=out)
+                print(f"  Errors: {status.get('error_count', 0):,}", file=out)
+                print(f"  Reconnects: {status.get('reconnect_count', 0)}", file=out)
                 
                 uptime = status.get('uptime_seconds', 0)
-                print(f"  Uptime: {self.format_uptime(uptime)}")
+                print(f"  Uptime: {format_uptime(uptime)}", file=out)
                 
                 channels = status.get('subscribed_channels', [])
-                print(f"  Channels: {', '.join(channels) if channels else 'None'}")
+                print(f"  Channels: {', '.join(channels) if channels else 'None'}", file=out)
         else:
-            print("❌ No collector status information available")
+            print("❌ No collector status information available", file=out)
         
         # 시스템 건강성 점수
         health_score = self.calculate_health_score(queue_stats, collector_statuses, subscriptions)
         health_emoji = "🟢" if health_score >= 80 else "🟡" if health_score >= 60 else "🔴"
-        print(f"\n{health_emoji} SYSTEM HEALTH: {health_score}%")
+        print(f"\n{health_emoji} SYSTEM HEALTH: {health_score}%", file=out)
+        
+        print("="*80, file=out)
         
-        print("="*80)
+        # 터미널이면 커서를 홈으로 옮기고 화면을 지운 뒤 다시 그림 (스크롤/깜빡임 방지)
+        prefix = CLEAR_SCREEN if sys.stdout.isatty() else ""
+        sys.stdout.write(prefix + out.getvalue())
+        sys.stdout.flush()
     
     def calculate_health_score(self, queue_stats: Dict, collector_statuses: Dict, 
                               subscriptions: List[Dict]) -> int:
@@ -267,24 +365,151 @@ class CollectionMonitor:
         
         return min(score, 100)
     
-    async def monitor_loop(self, refresh_interval: int = 10):
+    async def enable_keyspace_notifications(self, allow_config_set: bool = False) -> bool:
+        """Keyspace 알림 사용 가능 여부 확인
+        
+        서버에 이미 켜져 있으면 그대로 사용하고, allow_config_set인 경우에만
+        CONFIG SET으로 켠 뒤 종료 시 restore_keyspace_notifications로 복원합니다.
+        """
+        try:
+            config = await self.redis_client.config_get("notify-keyspace-events")
+            current = config.get("notify-keyspace-events", "")
+            missing = "".join(flag for flag in KEYSPACE_EVENT_FLAGS if flag not in current)
+            
+            # 'A'는 l, h를 포함하는 별칭
+            if "A" in current:
+                missing = missing.replace("l", "").replace("h", "")
+            
+            if not missing:
+                return True
+            
+            if not allow_config_set:
+                logger.info("Keyspace notifications are off on the server, using polling "
+                            "(pass --keyspace-events to enable them while monitoring)")
+                return False
+            
+            await self.redis_client.config_set("notify-keyspace-events", current + missing)
+            self.previous_keyspace_events = current
+            return True
+            
+        except Exception as e:
+            logger.info(f"Keyspace notifications unavailable, falling back to polling: {e}")
+            return False
+    
+    async def restore_keyspace_notifications(self):
+        """모니터가 변경한 notify-keyspace-events 설정 복원"""
+        if self.previous_keyspace_events is None:
+            return
+        
+        try:
+            await self.redis_client.config_set("notify-keyspace-events", self.previous_keyspace_events)
+            self.previous_keyspace_events = None
+        except Exception as e:
+            logger.warning(f"Failed to restore notify-keyspace-events: {e}")
+    
+    async def watch_keyspace_events(self, changed: asyncio.Event):
+        """큐/컬렉터 상태 변경 이벤트 구독"""
+        db = self.redis_client.connection_pool.connection_kwargs.get("db", 0)
+        pubsub = self.redis_client.pubsub()
+        
+        try:
+            await pubsub.subscribe(
+                f"__keyspace@{db}__:candle_data_queue",
+                f"__keyspace@{db}__:{STATUS_HASH_KEY}"
+            )
+            
+            # listen()은 클라이언트 socket_timeout으로 블로킹 읽기를 하므로 유휴 구간에서 끊김
+            # 명시적 timeout의 get_message는 만료 시 None을 반환 (헬스체크 PING도 이때 전송)
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=KEYSPACE_READ_TIMEOUT
+                )
+                if message is not None and message["type"] == "message":
+                    changed.set()
+                    
+        except Exception as e:
+            logger.warning(f"Keyspace event subscription lost, falling back to polling: {e}")
+        finally:
+            await pubsub.aclose()
+    
+    async def wait_for_next_refresh(self, refresh_interval: int, changed: asyncio.Event,
+                                    watcher: Optional[asyncio.Task], last_render: float):
+        """다음 갱신 시점까지 대기 (이벤트 구독 중이면 변경이 있을 때만 refresh_interval 간격으로 갱신)"""
+        if watcher is None or watcher.done():
+            await asyncio.sleep(refresh_interval)
+            return
+        
+        try:
+            await asyncio.wait_for(
+                changed.wait(), timeout=max(KEYSPACE_IDLE_POLL_SECONDS, refresh_interval)
+            )
+        except asyncio.TimeoutError:
+            return
+        
+        # 큐 LPUSH/RPOP 이벤트가 계속 들어와도 갱신 간격은 --refresh 이상으로 유지
+        elapsed = time.monotonic() - last_render
+        if elapsed < refresh_interval:
+            await asyncio.sleep(refresh_interval - elapsed)
+    
+    async def monitor_loop(self, refresh_interval: int = 10, keyspace_events: bool = False):
         """모니터링 루프"""
-        logger.info(f"Starting real-time monitoring (refresh every {refresh_interval}s)")
+        changed = asyncio.Event()
+        watcher = None
+        
+        if await self.enable_keyspace_notifications(allow_config_set=keyspace_events):
+            watcher = asyncio.create_task(self.watch_keyspace_events(changed))
+            logger.info(f"Starting real-time monitoring (refresh on Redis keyspace events, "
+                        f"at most every {refresh_interval}s)")
+        else:
+            logger.info(f"Starting real-time monitoring (refresh every {refresh_interval}s)")
         print("Press Ctrl+C to stop monitoring")
         
+        try:
+            await self._run_monitor_loop(refresh_interval, changed, watcher)
+        finally:
+            if watcher:
+                watcher.cancel()
+                try:
+                    await watcher
+                except asyncio.CancelledError:
+                    pass
+            await self.restore_keyspace_notifications()
+    
+    async def _run_monitor_loop(self, refresh_interval: int, changed: asyncio.Event,
+                                watcher: Optional[asyncio.Task]):
+        """모니터링 루프 본문"""
         while True:
             try:
-                # 데이터 수집
-                queue_stats = await self.get_queue_stats()
-                collector_statuses = await self.get_collector_statuses()
-                subscriptions = await self.get_subscription_info()
-                rates = await self.calculate_processing_rate(queue_stats)
+                # 이번 조회 이후의 변경만 다음 갱신을 유발하도록 먼저 초기화
+                changed.clear()
+                
+                # 데이터 수집 (Redis / Gateway 조회를 동시에 수행)
+                snapshot, subscriptions = await asyncio.gather(
+                    self.get_redis_snapshot(),
+                    self.get_subscription_info(),
+                    return_exceptions=True
+                )
+                
+                # 실패한 조회는 빈 결과로 처리
+                if isinstance(snapshot, Exception):
+                    logger.error(f"Failed to get Redis snapshot: {snapshot}")
+                    snapshot = ({}, {})
+                queue_stats, collector_statuses = snapshot
+                if isinstance(subscriptions, Exception):
+                    logger.debug(f"Failed to get subscription info: {subscriptions}")
+                    subscriptions = []
+                
+                rates = self.calculate_processing_rate(queue_stats)
                 
                 # 상태 리포트 출력
-                self.print_status_report(queue_stats, collector_statuses, subscriptions, rates)
+                self.print_status_report(
+                    queue_stats, collector_statuses, subscriptions, rates, now=datetime.now()
+                )
                 
                 # 다음 업데이트까지 대기
-                await asyncio.sleep(refresh_interval)
+                await self.wait_for_next_refresh(
+                    refresh_interval, changed, watcher, last_render=time.monotonic()
+                )
                 
             except KeyboardInterrupt:
                 logger.info("Monitoring stopped by user")
@@ -295,8 +520,11 @@ class CollectionMonitor:
     
     async def close(self):
         """리소스 정리"""
+        if self.http_session and not self.http_session.closed:
+            await self.http_session.close()
+        
         if self.redis_client:
-            await self.redis_client.close()
+            await self.redis_client.aclose()
 
 
 async def main():
@@ -310,6 +538,9 @@ async def main():
     parser.add_argument("--gateway-host", default="localhost", help="Gateway host (default: localhost)")
     parser.add_argument("--gateway-port", type=int, default=8000, help="Gateway port (default: 8000)")
     parser.add_argument("--refresh", type=int, default=10, help="Refresh interval in seconds (default: 10)")
+    parser.add_argument("--keyspace-events", action="store_true",
+                        help="Enable Redis keyspace notifications (CONFIG SET) while monitoring; "
+                             "restored on exit")
     
     args = parser.parse_args()
     
@@ -331,7 +562,7 @@ async def main():
             sys.exit(1)
         
         # 모니터링 시작
-        await monitor.monitor_loop(args.refresh)
+        await monitor.monitor_loop(args.refresh, keyspace_events=args.keyspace_events)
         
     except KeyboardInterrupt:
         logger.info("Monitoring interrupted by user")
@@ -6,17 +6,24 @@ CCXT 기반 일일 데이터 유지보수 스크립트
 
 import asyncio
 import sys
+import time
 import argparse
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set, Tuple
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 import asyncpg
 import ccxt.async_support as ccxt
+import numpy as np
 from dotenv import load_dotenv
 import structlog
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 import os
 
+try:
+    import uvloop
+except ImportError:  # uvloop 미설치 환경(Windows 등)에서는 기본 이벤트 루프 사용
+    uvloop = None
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -37,6 +44,103 @@ structlog.configure(
 logger = structlog.get_logger(__name__)
 
 
+# 유효한 캔들 조건 (갭 채우기 시 필터, fix_invalid_data에서는 부정 조건으로 사용)
+VALID_CANDLE_PREDICATE = """
+    open_price > 0 AND high_price > 0 AND low_price > 0
+    AND close_price > 0 AND volume > 0
+    AND high_price >= low_price
+    AND high_price >= open_price
+    AND high_price >= close_price
+    AND low_price <= open_price
+    AND low_price <= close_price
+"""
+
+# 심볼의 모든 대상 타임프레임 누락 타임스탬프 조회 (예상 타임스탬프를 서버에서 생성,
+# 타임프레임별로 bigint 배열 하나로 묶어 반환)
+SELECT_MISSING_TIMESTAMPS_SQL = """
+    SELECT w.timeframe, array_agg(gs.ts ORDER BY gs.ts) AS missing
+    FROM unnest($2::text[], $3::bigint[], $4::bigint[], $5::bigint[])
+         AS w(timeframe, start_ts, end_ts, interval_ms)
+    CROSS JOIN LATERAL generate_series(w.start_ts, w.end_ts, w.interval_ms) AS gs(ts)
+    LEFT JOIN trading.candlesticks c
+        ON c.symbol = $1 AND c.timeframe = w.timeframe AND c.timestamp_ms = gs.ts
+    WHERE c.timestamp_ms IS NULL
+    GROUP BY w.timeframe
+"""
+
+# 가장 오래된 레코드(최소 id) 하나만 남기고 나머지 중복 삭제
+DELETE_DUPLICATES_SQL = """
+    DELETE FROM trading.candlesticks c
+    USING (
+        SELECT id, timestamp_ms,
+               ROW_NUMBER() OVER (
+                   PARTITION BY symbol, timeframe, timestamp_ms
+                   ORDER BY id
+               ) AS rn
+        FROM trading.candlesticks
+        WHERE symbol = $1 AND timeframe = $2 AND timestamp_ms >= $3
+    ) d
+    WHERE c.id = d.id AND c.timestamp_ms = d.timestamp_ms AND d.rn > 1
+"""
+
+# 잘못된 데이터 삭제 (가격이 0이거나 음수, 볼륨이 0 이하 - 재수집으로 대체)
+DELETE_INVALID_SQL = f"""
+    DELETE FROM trading.candlesticks
+    WHERE symbol = $1 AND timeframe = $2 AND timestamp_ms >= $3
+    AND NOT ({VALID_CANDLE_PREDICATE})
+"""
+
+# 마지막으로 검증된 캔들 위치 테이블 존재 여부 (init-db.sql에서 생성, 이후 실행에서는 그 이후 범위만 검사)
+CURSOR_TABLE_EXISTS_SQL = """
+    SELECT to_regclass('trading.maintenance_cursor') IS NOT NULL
+"""
+
+# 갭/중복 검사용 커버링 인덱스 존재 여부 (init-db.sql에서 생성)
+# 잠금 없이 만들려면 파티션별 CREATE INDEX CONCURRENTLY가 필요하므로 여기서는 확인만 함
+SCAN_INDEX_EXISTS_SQL = """
+    SELECT EXISTS (
+        SELECT 1 FROM pg_indexes
+        WHERE schemaname = 'trading' AND tablename = 'candlesticks'
+        AND indexname = 'uq_candlesticks_symbol_timeframe_timestamp'
+    )
+"""
+
+SELECT_CURSORS_SQL = """
+    SELECT timeframe, last_verified_ts
+    FROM trading.maintenance_cursor
+    WHERE symbol = $1
+"""
+
+UPSERT_CURSOR_SQL = """
+    INSERT INTO trading.maintenance_cursor (symbol, timeframe, last_verified_ts)
+    VALUES ($1, $2, $3)
+    ON CONFLICT (symbol, timeframe) DO UPDATE SET
+        last_verified_ts = GREATEST(maintenance_cursor.last_verified_ts,
+                                    EXCLUDED.last_verified_ts),
+        updated_at = NOW()
+"""
+
+# 배열 파라미터를 unnest로 펼쳐 유효한 캔들만 반영하고 실제 삽입된 행 수만 반환
+# (ccxt_historical_backfill.py의 INSERT_CANDLES_SQL과 같은 방식)
+INSERT_GAP_CANDLES_SQL = f"""
+    WITH inserted AS (
+        INSERT INTO trading.candlesticks
+        (symbol, timeframe, timestamp_ms, open_price, high_price,
+         low_price, close_price, volume)
+        SELECT $1, $2, c.timestamp_ms, c.open_price, c.high_price,
+               c.low_price, c.close_price, c.volume
+        FROM unnest($3::bigint[], $4::float8[], $5::float8[], $6::float8[],
+                    $7::float8[], $8::float8[])
+             AS c(timestamp_ms, open_price, high_price, low_price, close_price, volume)
+        WHERE {VALID_CANDLE_PREDICATE}
+        ON CONFLICT (symbol, timeframe, timestamp_ms)
+        DO NOTHING
+        RETURNING 1
+    )
+    SELECT count(*) FROM inserted
+"""
+
+
 @dataclass
 class MaintenanceStats:
     """유지보수 통계"""
@@ -50,6 +154,12 @@ class MaintenanceStats:
     total_errors: int = 0
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
+    
+    def merge(self, other: "MaintenanceStats"):
+        """다른 작업 단위의 카운터를 합산"""
+        for field in fields(self):
+            if field.type is int:
+                setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
 
 
 @dataclass
@@ -72,7 +182,10 @@ class CCXTDailyMaintenance:
                  db_name: str = "trading_bot",
                  db_user: str = "trading_bot",
                  db_password: str = "trading_bot_password",
-                 exchange_id: str = "okx"):
+                 exchange_id: str = "okx",
+                 max_concurrency: int = 8,
+                 max_api_concurrency: int = 4,
+                 use_cursor: bool = True):
         
         self.db_host = db_host
         self.db_port = db_port
@@ -85,6 +198,13 @@ class CCXTDailyMaintenance:
         self.exchange_id = exchange_id
         self.exchange = None
         
+        # 동시 실행 제한 (심볼 검사, 거래소 API 호출)
+        self.max_concurrency = max_concurrency
+        self.api_semaphore = asyncio.Semaphore(max_api_concurrency)
+        
+        # 검증 완료 범위 건너뛰기 여부
+        self.use_cursor = use_cursor
+        
         # 타임프레임별 간격 (분 단위)
         self.timeframe_intervals = {
             "1m": 1,
@@ -95,8 +215,20 @@ class CCXTDailyMaintenance:
             "1d": 1440
         }
         
-        # 검사 대상 타임프레임
-        self.target_timeframes = ["5m", "15m", "1h", "4h", "1d"]
+        # 타임프레임별 간격 (밀리초 단위, 미리 계산)
+        self.interval_ms = {
+            timeframe: minutes * 60 * 1000
+            for timeframe, minutes in self.timeframe_intervals.items()
+        }
+        
+        # 검사 대상 타임프레임 (타임프레임, 간격 밀리초)
+        self.target_timeframes = [
+            (timeframe, self.interval_ms[timeframe])
+            for timeframe in ("5m", "15m", "1h", "4h", "1d")
+        ]
+        
+        # 이번 실행의 타임프레임별 기본 검사 범위 (run_maintenance 시작 시 한 번 계산)
+        self.check_windows: Optional[Dict[str, Tuple[int, int]]] = None
         
         # 통계
         self.stats = MaintenanceStats()
@@ -105,6 +237,9 @@ class CCXTDailyMaintenance:
         """초기화"""
         try:
             # 데이터베이스 연결 풀 생성
+            # 정리/갭 채우기는 재실행으로 복구 가능하므로 커밋마다 WAL fsync를 기다리지 않음
+            # (커밋 순서는 보장되므로 커서가 채워진 데이터보다 앞서 저장되지 않음, 비동기 커밋은
+            #  WAL writer가 wal_writer_delay의 약 3배 이내에 디스크에 기록)
             self.db_pool = await asyncpg.create_pool(
                 host=self.db_host,
                 port=self.db_port,
@@ -113,12 +248,30 @@ class CCXTDailyMaintenance:
                 password=self.db_password,
                 min_size=2,
                 max_size=10,
-                command_timeout=300
+                command_timeout=300,
+                server_settings={
+                    'synchronous_commit': 'off',
+                    'jit': 'off',
+                    'application_name': 'ccxt_maintenance',
+                }
             )
             
-            # 연결 테스트
+            # 연결 테스트 및 유지보수 커서 테이블, 검사용 인덱스 확인 (DDL은 init-db.sql에서만 실행)
             async with self.db_pool.acquire() as conn:
                 await conn.fetchval("SELECT 1")
+                if self.use_cursor and not await conn.fetchval(CURSOR_TABLE_EXISTS_SQL):
+                    logger.warning(
+                        "Table trading.maintenance_cursor is missing; falling back to a full "
+                        "scan of the window (create it from scripts/init-db.sql)"
+                    )
+                    self.use_cursor = False
+                if not await conn.fetchval(SCAN_INDEX_EXISTS_SQL):
+                    logger.warning(
+                        "Index uq_candlesticks_symbol_timeframe_timestamp is missing on "
+                        "trading.candlesticks; gap/duplicate scans will be slow. Build it with "
+                        "CREATE UNIQUE INDEX CONCURRENTLY on each partition, then attach them "
+                        "to the parent index (see scripts/init-db.sql)"
+                    )
             
             # CCXT 거래소 초기화
             exchange_class = getattr(ccxt, self.exchange_id)
@@ -150,8 +303,7 @@ class CCXTDailyMaintenance:
     async def get_active_symbols(self, hours_back: int = 25) -> List[str]:
         """지난 N시간 내 데이터가 있는 활성 심볼 목록 조회"""
         try:
-            cutoff_time = datetime.now() - timedelta(hours=hours_back)
-            cutoff_ts = int(cutoff_time.timestamp() * 1000)
+            cutoff_ts = int(time.time() * 1000) - hours_back * 3600 * 1000
             
             async with self.db_pool.acquire() as conn:
                 result = await conn.fetch("""
@@ -169,322 +321,392 @@ class CCXTDailyMaintenance:
             logger.error(f"Failed to get active symbols: {e}")
             return []
     
-    async def detect_data_gaps(self, symbol: str, timeframe: str, 
-                             hours_back: int = 25) -> List[DataGap]:
-        """데이터 갭 탐지"""
-        try:
-            # 검사 시간 범위 계산
-            end_time = datetime.now()
-            start_time = end_time - timedelta(hours=hours_back)
-            
-            end_ts = int(end_time.timestamp() * 1000)
-            start_ts = int(start_time.timestamp() * 1000)
-            
-            # 타임프레임 간격 (밀리초)
-            interval_minutes = self.timeframe_intervals.get(timeframe, 5)
-            interval_ms = interval_minutes * 60 * 1000
-            
-            # 기존 데이터 조회
+    def get_check_window(self, interval_ms: int, hours_back: int = 25,
+                         now_ts: Optional[int] = None) -> Tuple[int, int]:
+        """타임프레임 경계에 맞춘 검사 범위 (마지막으로 확정된 캔들까지)"""
+        if now_ts is None:
+            now_ts = int(time.time() * 1000)
+        
+        # 시작은 첫 캔들 경계로 올림, 끝은 진행 중인 캔들 직전 캔들
+        start_ts = now_ts - hours_back * 3600 * 1000
+        start_ts += -start_ts % interval_ms
+        end_ts = now_ts - now_ts % interval_ms - interval_ms
+        
+        return start_ts, end_ts
+    
+    def build_check_windows(self, hours_back: int = 25,
+                            now_ts: Optional[int] = None) -> Dict[str, Tuple[int, int]]:
+        """모든 대상 타임프레임의 기본 검사 범위 (같은 기준 시각 사용)"""
+        if now_ts is None:
+            now_ts = int(time.time() * 1000)
+        
+        return {
+            timeframe: self.get_check_window(interval_ms, hours_back, now_ts)
+            for timeframe, interval_ms in self.target_timeframes
+        }
+    
+    async def get_check_windows(self, symbol: str, hours_back: int,
+                                conn: asyncpg.Connection) -> Dict[str, Tuple[int, int]]:
+        """타임프레임별 검사 범위 (유지보수 커서 이전의 검증된 구간은 제외)"""
+        windows = dict(self.check_windows or self.build_check_windows(hours_back))
+        
+        if not self.use_cursor:
+            return windows
+        
+        # 마지막 검증 캔들부터 다시 검사 (한 캔들 겹침)
+        for row in await conn.fetch(SELECT_CURSORS_SQL, symbol):
+            window = windows.get(row['timeframe'])
+            if window and row['last_verified_ts'] > window[0]:
+                windows[row['timeframe']] = (row['last_verified_ts'], window[1])
+        
+        return windows
+    
+    async def detect_all_gaps(self, symbol: str, 
+                            hours_back: int = 25,
+                            conn: Optional[asyncpg.Connection] = None,
+                            windows: Optional[Dict[str, Tuple[int, int]]] = None,
+                            stats: Optional[MaintenanceStats] = None
+                            ) -> Dict[str, List[DataGap]]:
+        """심볼의 모든 대상 타임프레임 데이터 갭 탐지 (단일 쿼리, conn이 주어지면 해당 연결 사용)"""
+        if conn is None:
             async with self.db_pool.acquire() as conn:
-                existing_data = await conn.fetch("""
-                    SELECT timestamp_ms
-                    FROM trading.candlesticks
-                    WHERE symbol = $1 AND timeframe = $2
-                    AND timestamp_ms BETWEEN $3 AND $4
-                    ORDER BY timestamp_ms
-                """, symbol, timeframe, start_ts, end_ts)
-            
-            existing_timestamps = {row['timestamp_ms'] for row in existing_data}
-            
-            # 예상 타임스탬프 생성
-            expected_timestamps = set()
-            current_ts = start_ts
-            while current_ts <= end_ts:
-                expected_timestamps.add(current_ts)
-                current_ts += interval_ms
-            
-            # 누락된 타임스탬프 찾기
-            missing_timestamps = expected_timestamps - existing_timestamps
+                return await self.detect_all_gaps(symbol, hours_back, conn, windows, stats)
+        
+        if stats is None:
+            stats = self.stats
+        
+        try:
+            if windows is None:
+                windows = self.check_windows or self.build_check_windows(hours_back)
+            
+            # 모든 타임프레임의 누락 타임스탬프만 한 번에 조회
+            missing_data = await conn.fetch(
+                SELECT_MISSING_TIMESTAMPS_SQL,
+                symbol,
+                [timeframe for timeframe, _ in self.target_timeframes],
+                [windows[timeframe][0] for timeframe, _ in self.target_timeframes],
+                [windows[timeframe][1] for timeframe, _ in self.target_timeframes],
+                [interval_ms for _, interval_ms in self.target_timeframes]
+            )
             
-            if not missing_timestamps:
-                return []
+            missing_by_timeframe = {row['timeframe']: row['missing'] for row in missing_data}
             
-            # 연속된 갭을 그룹화
-            gaps = []
-            sorted_missing = sorted(missing_timestamps)
+            return {
+                timeframe: self.find_data_gaps(
+                    symbol, timeframe, interval_ms,
+                    missing_by_timeframe.get(timeframe, []), *windows[timeframe]
+                )
+                for timeframe, interval_ms in self.target_timeframes
+            }
             
-            if sorted_missing:
-                gap_start = sorted_missing[0]
-                gap_end = sorted_missing[0]
-                
-                for i in range(1, len(sorted_missing)):
-                    if sorted_missing[i] == gap_end + interval_ms:
-                        gap_end = sorted_missing[i]
-                    else:
-                        # 갭 완료
-                        missing_count = (gap_end - gap_start) // interval_ms + 1
-                        gaps.append(DataGap(
-                            symbol=symbol,
-                            timeframe=timeframe,
-                            start_ts=gap_start,
-                            end_ts=gap_end,
-                            expected_count=len(expected_timestamps),
-                            missing_count=missing_count
-                        ))
-                        gap_start = sorted_missing[i]
-                        gap_end = sorted_missing[i]
-                
-                # 마지막 갭 추가
-                missing_count = (gap_end - gap_start) // interval_ms + 1
-                gaps.append(DataGap(
+        except Exception as e:
+            logger.error(f"Failed to detect gaps for {symbol}: {e}")
+            stats.total_errors += 1
+            return {}
+    
+    def find_data_gaps(self, symbol: str, timeframe: str, interval_ms: int,
+                       missing_timestamps: List[int],
+                       start_ts: int, end_ts: int) -> List[DataGap]:
+        """정렬된 누락 타임스탬프를 연속 구간(갭)으로 묶기"""
+        if not missing_timestamps:
+            return []
+        
+        expected_count = max(0, (end_ts - start_ts) // interval_ms + 1)
+        missing = np.array(missing_timestamps, dtype=np.int64)
+        
+        # 간격이 끊기는 지점을 기준으로 연속된 갭을 그룹화
+        breaks = np.flatnonzero(np.diff(missing) != interval_ms)
+        gap_starts = missing[np.r_[0, breaks + 1]].tolist()
+        gap_ends = missing[np.r_[breaks, missing.size - 1]].tolist()
+        
+        gaps = [
+            DataGap(
+                symbol=symbol,
+                timeframe=timeframe,
+                start_ts=gap_start,
+                end_ts=gap_end,
+                expected_count=expected_count,
+                missing_count=(gap_end - gap_start) // interval_ms + 1
+            )
+            for gap_start, gap_end in zip(gap_starts, gap_ends)
+        ]
+        
+        logger.info(f"Found {len(gaps)} gaps for {symbol}/{timeframe} "
+                   f"(total missing: {missing.size})")
+        
+        return gaps
+    
+    async def fetch_gap_candles(self, symbol: str, timeframe: str, 
+                              since: int, until: int, interval_ms: int,
+                              stats: MaintenanceStats) -> List[list]:
+        """갭 전체 범위의 OHLCV를 조회 (limit 초과 시에만 이어서 조회)"""
+        candles = []
+        
+        while since <= until:
+            async with self.api_semaphore:
+                ohlcv_data = await self.exchange.fetch_ohlcv(
                     symbol=symbol,
                     timeframe=timeframe,
-                    start_ts=gap_start,
-                    end_ts=gap_end,
-                    expected_count=len(expected_timestamps),
-                    missing_count=missing_count
-                ))
+                    since=since,
+                    limit=1000
+                )
             
-            if gaps:
-                total_missing = sum(gap.missing_count for gap in gaps)
-                logger.info(f"Found {len(gaps)} gaps for {symbol}/{timeframe} "
-                           f"(total missing: {total_missing})")
+            stats.api_calls_made += 1
+            
+            if not ohlcv_data:
+                break
             
-            return gaps
+            candles.extend(ohlcv_data)
             
-        except Exception as e:
-            logger.error(f"Failed to detect gaps for {symbol}/{timeframe}: {e}")
-            return []
+            next_since = ohlcv_data[-1][0] + interval_ms
+            if next_since <= since:
+                break
+            since = next_since
+        
+        return candles
     
-    async def fill_data_gap(self, gap: DataGap) -> int:
-        """데이터 갭 채우기"""
+    async def fill_data_gaps(self, symbol: str, timeframe: str, interval_ms: int,
+                             gaps: List[DataGap],
+                             stats: Optional[MaintenanceStats] = None) -> int:
+        """타임프레임의 모든 데이터 갭 채우기 (OHLCV는 한 번에 조회 후 갭별로 분배)"""
+        if stats is None:
+            stats = self.stats
+        
         try:
-            logger.info(f"Filling gap for {gap.symbol}/{gap.timeframe}: "
-                       f"{datetime.fromtimestamp(gap.start_ts/1000)} to "
-                       f"{datetime.fromtimestamp(gap.end_ts/1000)}")
+            logger.info(f"Filling {len(gaps)} gaps for {symbol}/{timeframe}: "
+                       f"{datetime.fromtimestamp(gaps[0].start_ts/1000)} to "
+                       f"{datetime.fromtimestamp(gaps[-1].end_ts/1000)}")
             
             # CCXT를 통해 누락 데이터 조회
             if not self.exchange.has['fetchOHLCV']:
                 logger.error(f"Exchange {self.exchange_id} does not support fetchOHLCV")
                 return 0
             
-            # 약간 더 넓은 범위로 데이터 조회 (경계 데이터 확보)
-            interval_ms = self.timeframe_intervals.get(gap.timeframe, 5) * 60 * 1000
-            fetch_start = gap.start_ts - interval_ms
-            fetch_end = gap.end_ts + interval_ms
-            
-            ohlcv_data = await self.exchange.fetch_ohlcv(
-                symbol=gap.symbol,
-                timeframe=gap.timeframe,
-                since=fetch_start,
-                limit=1000
+            # 첫 갭 시작부터 마지막 갭 끝까지 한 번에 조회
+            ohlcv_data = await self.fetch_gap_candles(
+                symbol, timeframe, gaps[0].start_ts, gaps[-1].end_ts, interval_ms, stats
             )
             
-            self.stats.api_calls_made += 1
-            
             if not ohlcv_data:
-                logger.warning(f"No data received from exchange for {gap.symbol}/{gap.timeframe}")
+                logger.warning(f"No data received from exchange for {symbol}/{timeframe}")
                 return 0
             
-            # 갭 범위 내의 데이터만 필터링
-            gap_data = [
-                candle for candle in ohlcv_data
-                if gap.start_ts <= candle[0] <= gap.end_ts
-            ]
+            # OHLCV를 한 번에 float64 배열로 변환 (누락 값은 NaN)
+            candles = np.array([candle[:6] for candle in ohlcv_data], dtype=np.float64)
+            timestamps = candles[:, 0].astype(np.int64)
+            
+            # 갭 범위 내의 데이터만 필터링 (갭은 시작 시각 기준 정렬됨)
+            gap_starts = np.array([gap.start_ts for gap in gaps], dtype=np.int64)
+            gap_ends = np.array([gap.end_ts for gap in gaps], dtype=np.int64)
+            gap_index = np.searchsorted(gap_starts, timestamps, side="right") - 1
+            in_gap = (gap_index >= 0) & (timestamps <= gap_ends[np.maximum(gap_index, 0)])
             
-            if not gap_data:
-                logger.warning(f"No data in gap range for {gap.symbol}/{gap.timeframe}")
+            # NaN은 PostgreSQL에서 모든 값보다 크게 비교되므로 SQL 유효성 검사 전에 제외
+            in_gap &= ~np.isnan(candles).any(axis=1)
+            
+            if not in_gap.any():
+                logger.warning(f"No data in gap range for {symbol}/{timeframe}")
                 return 0
             
-            # 데이터베이스에 삽입
-            inserted_count = 0
+            # 컬럼별 배열로 전달 (유효성 검사는 INSERT ... SELECT의 WHERE 조건에서 처리)
+            columns = candles[in_gap, 1:].T.tolist()
+            
+            # 한 번의 unnest INSERT ... SELECT로 반영
             async with self.db_pool.acquire() as conn:
-                async with conn.transaction():
-                    for candle in gap_data:
-                        try:
-                            timestamp_ms = int(candle[0])
-                            open_price = float(candle[1])
-                            high_price = float(candle[2])
-                            low_price = float(candle[3])
-                            close_price = float(candle[4])
-                            volume = float(candle[5])
-                            
-                            # 데이터 유효성 검사
-                            if volume <= 0 or close_price <= 0:
-                                continue
-                            
-                            result = await conn.execute("""
-                                INSERT INTO trading.candlesticks 
-                                (symbol, timeframe, timestamp_ms, open_price, high_price, 
-                                 low_price, close_price, volume)
-                                VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-                                ON CONFLICT (symbol, timeframe, timestamp_ms) 
-                                DO NOTHING
-                            """, gap.symbol, gap.timeframe, timestamp_ms,
-                                 open_price, high_price, low_price,
-                                 close_price, volume)
-                            
-                            if result == "INSERT 0 1":
-                                inserted_count += 1
-                                
-                        except Exception as e:
-                            logger.error(f"Failed to insert gap candle {candle}: {e}")
-                            continue
-            
-            logger.info(f"Filled gap for {gap.symbol}/{gap.timeframe}: {inserted_count} candles inserted")
+                inserted_count = await conn.fetchval(
+                    INSERT_GAP_CANDLES_SQL, symbol, timeframe,
+                    timestamps[in_gap].tolist(), *columns
+                )
+            
+            logger.info(f"Filled gaps for {symbol}/{timeframe}: {inserted_count} candles inserted")
             return inserted_count
             
         except Exception as e:
-            logger.error(f"Failed to fill gap for {gap.symbol}/{gap.timeframe}: {e}")
-            self.stats.total_errors += 1
+            logger.error(f"Failed to fill gaps for {symbol}/{timeframe}: {e}")
+            stats.total_errors += 1
             return 0
     
     async def remove_duplicates(self, symbol: str, timeframe: str, 
-                              hours_back: int = 25) -> int:
-        """중복 데이터 제거"""
+                              hours_back: int = 25,
+                              conn: Optional[asyncpg.Connection] = None,
+                              since_ts: Optional[int] = None,
+                              stats: Optional[MaintenanceStats] = None) -> int:
+        """중복 데이터 제거 (conn이 주어지면 해당 연결, since_ts가 주어지면 해당 시점부터)"""
+        if conn is None:
+            async with self.db_pool.acquire() as conn:
+                return await self.remove_duplicates(symbol, timeframe, hours_back, conn, since_ts, stats)
+        
+        if stats is None:
+            stats = self.stats
+        
         try:
-            cutoff_time = datetime.now() - timedelta(hours=hours_back)
-            cutoff_ts = int(cutoff_time.timestamp() * 1000)
+            if since_ts is None:
+                cutoff_ts = int(time.time() * 1000) - hours_back * 3600 * 1000
+            else:
+                cutoff_ts = since_ts
+            
+            result = await conn.execute(
+                DELETE_DUPLICATES_SQL, symbol, timeframe, cutoff_ts
+            )
+            
+            removed_count = int(result.split()[-1])
+            
+            if removed_count > 0:
+                logger.info(f"Removed {removed_count} duplicate records for {symbol}/{timeframe}")
+            
+            return removed_count
             
-            async with self.db_pool.acquire() as conn:
-                # 중복 데이터 조회
-                duplicates = await conn.fetch("""
-                    SELECT symbol, timeframe, timestamp_ms, COUNT(*) as count
-                    FROM trading.candlesticks
-                    WHERE symbol = $1 AND timeframe = $2 AND timestamp_ms >= $3
-                    GROUP BY symbol, timeframe, timestamp_ms
-                    HAVING COUNT(*) > 1
-                """, symbol, timeframe, cutoff_ts)
-                
-                if not duplicates:
-                    return 0
-                
-                removed_count = 0
-                async with conn.transaction():
-                    for dup in duplicates:
-                        # 가장 오래된 레코드 하나만 남기고 나머지 삭제
-                        result = await conn.execute("""
-                            DELETE FROM trading.candlesticks
-                            WHERE symbol = $1 AND timeframe = $2 AND timestamp_ms = $3
-                            AND id NOT IN (
-                                SELECT MIN(id) 
-                                FROM trading.candlesticks 
-                                WHERE symbol = $1 AND timeframe = $2 AND timestamp_ms = $3
-                            )
-                        """, dup['symbol'], dup['timeframe'], dup['timestamp_ms'])
-                        
-                        removed_count += int(result.split()[-1]) if result.split() else 0
-                
-                if removed_count > 0:
-                    logger.info(f"Removed {removed_count} duplicate records for {symbol}/{timeframe}")
-                
-                return removed_count
-                
         except Exception as e:
             logger.error(f"Failed to remove duplicates for {symbol}/{timeframe}: {e}")
-            self.stats.total_errors += 1
+            stats.total_errors += 1
             return 0
     
     async def fix_invalid_data(self, symbol: str, timeframe: str, 
-                             hours_back: int = 25) -> int:
-        """잘못된 데이터 수정"""
+                             hours_back: int = 25,
+                             conn: Optional[asyncpg.Connection] = None,
+                             since_ts: Optional[int] = None,
+                             stats: Optional[MaintenanceStats] = None) -> int:
+        """잘못된 데이터 수정 (conn이 주어지면 해당 연결, since_ts가 주어지면 해당 시점부터)"""
+        if conn is None:
+            async with self.db_pool.acquire() as conn:
+                return await self.fix_invalid_data(symbol, timeframe, hours_back, conn, since_ts, stats)
+        
+        if stats is None:
+            stats = self.stats
+        
         try:
-            cutoff_time = datetime.now() - timedelta(hours=hours_back)
-            cutoff_ts = int(cutoff_time.timestamp() * 1000)
+            if since_ts is None:
+                cutoff_ts = int(time.time() * 1000) - hours_back * 3600 * 1000
+            else:
+                cutoff_ts = since_ts
+            
+            result = await conn.execute(
+                DELETE_INVALID_SQL, symbol, timeframe, cutoff_ts
+            )
+            
+            fixed_count = int(result.split()[-1])
+            
+            if fixed_count > 0:
+                logger.info(f"Fixed {fixed_count} invalid records for {symbol}/{timeframe}")
+            
+            return fixed_count
             
-            async with self.db_pool.acquire() as conn:
-                # 잘못된 데이터 조회 (가격이 0이거나 음수, 볼륨이 0 이하)
-                invalid_data = await conn.fetch("""
-                    SELECT id, symbol, timeframe, timestamp_ms
-                    FROM trading.candlesticks
-                    WHERE symbol = $1 AND timeframe = $2 AND timestamp_ms >= $3
-                    AND (open_price <= 0 OR high_price <= 0 OR low_price <= 0 
-                         OR close_price <= 0 OR volume <= 0
-                         OR high_price < low_price
-                         OR high_price < open_price
-                         OR high_price < close_price
-                         OR low_price > open_price
-                         OR low_price > close_price)
-                """, symbol, timeframe, cutoff_ts)
-                
-                if not invalid_data:
-                    return 0
-                
-                fixed_count = 0
-                async with conn.transaction():
-                    for invalid in invalid_data:
-                        # 잘못된 데이터 삭제 (재수집으로 대체)
-                        await conn.execute("""
-                            DELETE FROM trading.candlesticks
-                            WHERE id = $1
-                        """, invalid['id'])
-                        fixed_count += 1
-                
-                if fixed_count > 0:
-                    logger.info(f"Fixed {fixed_count} invalid records for {symbol}/{timeframe}")
-                
-                return fixed_count
-                
         except Exception as e:
             logger.error(f"Failed to fix invalid data for {symbol}/{timeframe}: {e}")
-            self.stats.total_errors += 1
+            stats.total_errors += 1
             return 0
     
-    async def check_data_integrity(self, symbol: str, timeframe: str, 
-                                 hours_back: int = 25) -> Dict[str, int]:
-        """특정 심볼/타임프레임의 데이터 무결성 검사 및 수정"""
-        logger.info(f"Checking data integrity for {symbol}/{timeframe}")
+    async def update_cursors(self, symbol: str, windows: Dict[str, Tuple[int, int]],
+                             gaps_by_timeframe: Dict[str, List[DataGap]],
+                             stats: MaintenanceStats):
+        """타임프레임별 유지보수 커서 갱신"""
+        cursors = []
+        for timeframe, interval_ms in self.target_timeframes:
+            if timeframe not in gaps_by_timeframe:
+                continue
+            gaps = gaps_by_timeframe[timeframe]
+            if gaps:
+                verified_ts = gaps[0].start_ts - interval_ms
+            else:
+                verified_ts = windows[timeframe][1]
+            cursors.append((symbol, timeframe, verified_ts))
+        
+        try:
+            async with self.db_pool.acquire() as conn:
+                await conn.executemany(UPSERT_CURSOR_SQL, cursors)
+        except Exception as e:
+            logger.error(f"Failed to update maintenance cursors for {symbol}: {e}")
+            stats.total_errors += 1
+    
+    async def check_symbol_integrity(self, symbol: str, 
+                                   hours_back: int = 25) -> MaintenanceStats:
+        """심볼의 모든 대상 타임프레임 데이터 무결성 검사 및 수정 (심볼 단위 통계 반환)"""
+        logger.info(f"Checking data integrity for {symbol}")
+        
+        stats = MaintenanceStats()
         
         results = {
-            "gaps_found": 0,
-            "gaps_filled": 0,
-            "duplicates_removed": 0,
-            "invalid_data_fixed": 0
+            timeframe: {
+                "gaps_found": 0,
+                "gaps_filled": 0,
+                "duplicates_removed": 0,
+                "invalid_data_fixed": 0
+            }
+            for timeframe, _ in self.target_timeframes
         }
         
         try:
-            # 1. 중복 데이터 제거
-            removed = await self.remove_duplicates(symbol, timeframe, hours_back)
-            results["duplicates_removed"] = removed
-            self.stats.duplicates_removed += removed
-            
-            # 2. 잘못된 데이터 수정
-            fixed = await self.fix_invalid_data(symbol, timeframe, hours_back)
-            results["invalid_data_fixed"] = fixed
-            self.stats.invalid_data_fixed += fixed
-            
-            # 3. 데이터 갭 탐지 및 채우기
-            gaps = await self.detect_data_gaps(symbol, timeframe, hours_back)
-            results["gaps_found"] = len(gaps)
-            self.stats.gaps_found += len(gaps)
-            
-            filled_count = 0
-            for gap in gaps:
-                filled = await self.fill_data_gap(gap)
-                filled_count += filled
+            # 정리 및 갭 탐지는 하나의 연결로 처리 (거래소 조회 전에 반환)
+            async with self.db_pool.acquire() as conn:
+                windows = await self.get_check_windows(symbol, hours_back, conn)
                 
-                # API 레이트 리미트 준수
-                await asyncio.sleep(self.exchange.rateLimit / 1000)
-            
-            results["gaps_filled"] = filled_count
-            self.stats.gaps_filled += filled_count
-            
-            logger.info(f"Integrity check completed for {symbol}/{timeframe}: "
-                       f"gaps {results['gaps_found']}/{results['gaps_filled']}, "
-                       f"duplicates {results['duplicates_removed']}, "
-                       f"invalid {results['invalid_data_fixed']}")
+                for timeframe, _ in self.target_timeframes:
+                    since_ts = windows[timeframe][0]
+                    
+                    # 1. 중복 데이터 제거
+                    removed = await self.remove_duplicates(
+                        symbol, timeframe, hours_back, conn, since_ts, stats
+                    )
+                    results[timeframe]["duplicates_removed"] = removed
+                    stats.duplicates_removed += removed
+                    
+                    # 2. 잘못된 데이터 수정
+                    fixed = await self.fix_invalid_data(
+                        symbol, timeframe, hours_back, conn, since_ts, stats
+                    )
+                    results[timeframe]["invalid_data_fixed"] = fixed
+                    stats.invalid_data_fixed += fixed
+                
+                # 3. 데이터 갭 탐지 (정리 후 모든 타임프레임을 한 번에 조회)
+                gaps_by_timeframe = await self.detect_all_gaps(symbol, hours_back, conn, windows, stats)
+            
+            for timeframe, gaps in gaps_by_timeframe.items():
+                results[timeframe]["gaps_found"] = len(gaps)
+                stats.gaps_found += len(gaps)
+            
+            # 4. 타임프레임별 갭 채우기를 동시에 실행 (API 호출 수는 api_semaphore,
+            # 호출 간격은 CCXT 레이트 리미터가 제한)
+            gap_timeframes = [
+                (timeframe, interval_ms) for timeframe, interval_ms in self.target_timeframes
+                if gaps_by_timeframe.get(timeframe)
+            ]
+            filled_counts = await asyncio.gather(*(
+                self.fill_data_gaps(
+                    symbol, timeframe, interval_ms, gaps_by_timeframe[timeframe], stats
+                )
+                for timeframe, interval_ms in gap_timeframes
+            ))
+            
+            for (timeframe, _), filled_count in zip(gap_timeframes, filled_counts):
+                results[timeframe]["gaps_filled"] = filled_count
+                stats.gaps_filled += filled_count
+            
+            # 5. 오류 없이 끝난 경우 첫 갭 직전(갭이 없으면 검사 범위 끝)까지 검증 완료로 기록
+            if self.use_cursor and stats.total_errors == 0:
+                await self.update_cursors(symbol, windows, gaps_by_timeframe, stats)
+            
+            for timeframe, result in results.items():
+                logger.info(f"Integrity check completed for {symbol}/{timeframe}: "
+                           f"gaps {result['gaps_found']}/{result['gaps_filled']}, "
+                           f"duplicates {result['duplicates_removed']}, "
+                           f"invalid {result['invalid_data_fixed']}")
             
         except Exception as e:
-            logger.error(f"Failed integrity check for {symbol}/{timeframe}: {e}")
-            self.stats.total_errors += 1
+            logger.error(f"Failed integrity check for {symbol}: {e}")
+            stats.total_errors += 1
         
-        return results
+        stats.symbols_processed = 1
+        stats.timeframes_processed = len(self.target_timeframes)
+        return stats
     
     async def run_maintenance(self, target_symbols: Optional[List[str]] = None, 
                             hours_back: int = 25, dry_run: bool = False):
         """일일 데이터 유지보수 실행"""
         self.stats.start_time = datetime.now()
         
+        # 모든 심볼이 같은 기준 시각의 검사 범위를 사용
+        self.check_windows = self.build_check_windows(hours_back)
+        
         logger.info(f"Starting CCXT daily data maintenance")
         logger.info(f"Target period: last {hours_back} hours")
         logger.info(f"Dry run mode: {dry_run}")
@@ -492,7 +714,7 @@ class CCXTDailyMaintenance:
         if dry_run:
             print("🔍 DRY RUN MODE - No actual changes will be made")
             print(f"📅 Would check data integrity for last {hours_back} hours")
-            print(f"📊 Target timeframes: {self.target_timeframes}")
+            print(f"📊 Target timeframes: {[timeframe for timeframe, _ in self.target_timeframes]}")
             print("✅ Dry run completed - maintenance script is ready")
             return
         
@@ -509,18 +731,28 @@ class CCXTDailyMaintenance:
                 logger.warning("No symbols to process")
                 return
             
-            # 각 심볼과 타임프레임에 대해 무결성 검사
-            for symbol in symbols:
-                logger.info(f"Processing symbol: {symbol}")
-                
-                for timeframe in self.target_timeframes:
-                    await self.check_data_integrity(symbol, timeframe, hours_back)
-                    self.stats.timeframes_processed += 1
-                    
-                    # 심볼 간 짧은 대기
-                    await asyncio.sleep(0.1)
-                
-                self.stats.symbols_processed += 1
+            # 각 심볼에 대해 무결성 검사 (동시 실행 수 제한)
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            
+            async def run_check(symbol: str) -> MaintenanceStats:
+                async with semaphore:
+                    return await self.check_symbol_integrity(symbol, hours_back)
+            
+            logger.info(f"Processing {len(symbols)} symbols "
+                       f"(concurrency: {self.max_concurrency})")
+            
+            symbol_results = await asyncio.gather(
+                *(run_check(symbol) for symbol in symbols),
+                return_exceptions=True
+            )
+            
+            # 심볼별 통계를 마지막에 한 번에 합산
+            for symbol, result in zip(symbols, symbol_results):
+                if isinstance(result, MaintenanceStats):
+                    self.stats.merge(result)
+                else:
+                    logger.error(f"Integrity check task failed for {symbol}: {result}")
+                    self.stats.total_errors += 1
             
             self.stats.end_time = datetime.now()
             self.print_maintenance_report()
@@ -565,6 +797,12 @@ async def main():
     parser.add_argument("--db-name", default=os.getenv('DB_NAME', 'trading_bot'), help="Database name")
     parser.add_argument("--db-user", default=os.getenv('DB_USER', 'trading_bot'), help="Database user")
     parser.add_argument("--db-password", default=os.getenv('DB_PASSWORD'), help="Database password")
+    parser.add_argument("--concurrency", type=int, default=8,
+                       help="Max concurrent symbol checks (default: 8)")
+    parser.add_argument("--api-concurrency", type=int, default=4,
+                       help="Max concurrent exchange API requests (default: 4)")
+    parser.add_argument("--full-scan", action="store_true",
+                       help="Ignore maintenance cursors and re-check the whole window")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be done")
     
     args = parser.parse_args()
@@ -580,7 +818,10 @@ async def main():
         db_name=args.db_name,
         db_user=args.db_user,
         db_password=args.db_password or "trading_bot_password",
-        exchange_id=args.exchange
+        exchange_id=args.exchange,
+        max_concurrency=args.concurrency,
+        max_api_concurrency=args.api_concurrency,
+        use_cursor=not args.full_scan
     )
     
     try:
@@ -605,4 +846,6 @@ async def main():
 
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
\ No newline at end of file
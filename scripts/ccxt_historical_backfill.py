@@ -12,11 +12,17 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import asyncpg
 import ccxt.async_support as ccxt
+import numpy as np
 from dotenv import load_dotenv
 import structlog
 from dataclasses import dataclass
 import os
 
+try:
+    import uvloop
+except ImportError:  # uvloop 미설치 환경(Windows 등)에서는 기본 이벤트 루프 사용
+    uvloop = None
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -37,6 +43,50 @@ structlog.configure(
 logger = structlog.get_logger(__name__)
 
 
+# 조회 완료 후 삽입 대기 중인 최대 페이지 수
+PAGE_QUEUE_SIZE = 4
+
+# 여러 페이지를 모아 한 번에 삽입할 최소 캔들 수
+FLUSH_THRESHOLD = 8000
+
+# 기존 데이터 내부의 빈 구간 [gap_start, gap_end) 조회
+# (대상 구간 시작 직전의 마지막 캔들부터 포함해 시작 경계에 걸친 빈 구간도 찾음)
+# $1: symbol, $2: timeframe, $3: start_ts, $4: end_ts, $5: 타임프레임 간격(ms)
+FIND_INTERIOR_GAPS_SQL = """
+    SELECT timestamp_ms + $5 AS gap_start, next_ts AS gap_end
+    FROM (
+        SELECT timestamp_ms, LEAD(timestamp_ms) OVER (ORDER BY timestamp_ms) AS next_ts
+        FROM trading.candlesticks
+        WHERE symbol = $1 AND timeframe = $2
+          AND timestamp_ms >= COALESCE((
+              SELECT MAX(timestamp_ms) FROM trading.candlesticks
+              WHERE symbol = $1 AND timeframe = $2 AND timestamp_ms < $3
+          ), $3)
+          AND timestamp_ms <= $4
+    ) t
+    WHERE next_ts - timestamp_ms > $5
+    ORDER BY timestamp_ms
+"""
+
+# 컬럼 배열을 unnest로 펼쳐 한 번에 삽입하고 실제 삽입된 행 수만 반환
+INSERT_CANDLES_SQL = """
+    WITH inserted AS (
+        INSERT INTO trading.candlesticks
+        (symbol, timeframe, timestamp_ms, open_price, high_price,
+         low_price, close_price, volume)
+        SELECT $1, $2, c.timestamp_ms, c.open_price, c.high_price,
+               c.low_price, c.close_price, c.volume
+        FROM unnest($3::bigint[], $4::float8[], $5::float8[],
+                    $6::float8[], $7::float8[], $8::float8[])
+             AS c(timestamp_ms, open_price, high_price, low_price, close_price, volume)
+        ON CONFLICT (symbol, timeframe, timestamp_ms)
+        DO NOTHING
+        RETURNING 1
+    )
+    SELECT count(*) FROM inserted
+"""
+
+
 @dataclass
 class BackfillProgress:
     """백필 진행상황 추적"""
@@ -60,7 +110,9 @@ class CCXTHistoricalBackfill:
                  db_name: str = "trading_bot",
                  db_user: str = "trading_bot",
                  db_password: str = "trading_bot_password",
-                 exchange_id: str = "okx"):
+                 exchange_id: str = "okx",
+                 max_concurrency: int = 8,
+                 skip_existing: bool = True):
         
         self.db_host = db_host
         self.db_port = db_port
@@ -73,6 +125,12 @@ class CCXTHistoricalBackfill:
         self.exchange_id = exchange_id
         self.exchange = None
         
+        # 동시에 처리할 최대 심볼 수
+        self.max_concurrency = max_concurrency
+        
+        # 이미 적재된 구간(기존 최소~최대 타임스탬프) 재조회 생략 여부
+        self.skip_existing = skip_existing
+        
         # 타임프레임별 설정
         self.timeframe_config = {
             "1m": {"records_per_batch": 1000},
@@ -83,6 +141,10 @@ class CCXTHistoricalBackfill:
             "1d": {"records_per_batch": 1000}
         }
         
+        # 심볼/타임프레임 작업마다 연결 하나를 끝까지 사용하므로
+        # 동시 심볼 수 x 지원 타임프레임 수만큼 풀 크기 확보
+        self.pool_size = self.max_concurrency * len(self.timeframe_config)
+        
         # 진행상황 추적
         self.progress_tracker = {}
         
@@ -101,15 +163,23 @@ class CCXTHistoricalBackfill:
         """초기화"""
         try:
             # 데이터베이스 연결 풀 생성
+            # 백필은 재실행으로 복구 가능하므로 커밋마다 WAL fsync를 기다리지 않음
+            # (synchronous_commit=off는 이 풀의 세션에만 적용, 비동기 커밋은 WAL writer가
+            #  wal_writer_delay의 약 3배 이내에 디스크에 기록)
             self.db_pool = await asyncpg.create_pool(
                 host=self.db_host,
                 port=self.db_port,
                 database=self.db_name,
                 user=self.db_user,
                 password=self.db_password,
-                min_size=2,
-                max_size=20,
-                command_timeout=300
+                min_size=1,
+                max_size=self.pool_size,
+                command_timeout=300,
+                server_settings={
+                    'synchronous_commit': 'off',
+                    'jit': 'off',
+                    'application_name': 'ccxt_backfill',
+                }
             )
             
             # 연결 테스트
@@ -170,52 +240,36 @@ class CCXTHistoricalBackfill:
             return []
     
     async def insert_candles_batch(self, symbol: str, timeframe: str, 
-                                  ohlcv_data: List[List]) -> Tuple[int, int]:
-        """캔들 데이터 배치 삽입 (trading.candlesticks 테이블)"""
+                                  ohlcv_data: List[List],
+                                  conn: Optional[asyncpg.Connection] = None) -> Tuple[int, int]:
+        """캔들 데이터 배치 삽입 (trading.candlesticks 테이블, conn이 주어지면 해당 연결 사용)"""
+        if conn is None:
+            async with self.db_pool.acquire() as conn:
+                return await self.insert_candles_batch(symbol, timeframe, ohlcv_data, conn)
+        
         try:
             if not ohlcv_data:
                 return 0, 0
             
-            inserted_count = 0
-            duplicate_count = 0
+            # OHLCV를 한 번에 float64 배열로 변환 (누락 값은 NaN)
+            candles = np.array([candle[:6] for candle in ohlcv_data], dtype=np.float64)
             
-            async with self.db_pool.acquire() as conn:
-                async with conn.transaction():
-                    for candle in ohlcv_data:
-                        try:
-                            timestamp_ms = int(candle[0])
-                            open_price = float(candle[1])
-                            high_price = float(candle[2])
-                            low_price = float(candle[3])
-                            close_price = float(candle[4])
-                            volume = float(candle[5])
-                            
-                            # 데이터 유효성 검사
-                            if volume <= 0 or close_price <= 0:
-                                continue
-                            
-                            result = await conn.execute("""
-                                INSERT INTO trading.candlesticks 
-                                (symbol, timeframe, timestamp_ms, open_price, high_price, 
-                                 low_price, close_price, volume)
-                                VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-                                ON CONFLICT (symbol, timeframe, timestamp_ms) 
-                                DO NOTHING
-                            """, symbol, timeframe, timestamp_ms,
-                                 open_price, high_price, low_price,
-                                 close_price, volume)
-                            
-                            if result == "INSERT 0 1":
-                                inserted_count += 1
-                            else:
-                                duplicate_count += 1
-                                
-                        except Exception as e:
-                            logger.error(f"Failed to insert candle {candle}: {e}")
-                            continue
-            
-            self.total_stats["total_candles_inserted"] += inserted_count
-            self.total_stats["total_duplicates_skipped"] += duplicate_count
+            # 삽입할 캔들 선별 (볼륨/종가가 0 이하이거나 누락 값이 있는 캔들 제외)
+            valid = (candles[:, 5] > 0) & (candles[:, 4] > 0) & ~np.isnan(candles).any(axis=1)
+            candles = candles[valid]
+            
+            if not len(candles):
+                return 0, 0
+            
+            # 컬럼별 배열로 나누어 단일 INSERT ... SELECT unnest(...)로 반영
+            timestamps = candles[:, 0].astype(np.int64).tolist()
+            columns = candles[:, 1:].T.tolist()
+            
+            inserted_count = await conn.fetchval(
+                INSERT_CANDLES_SQL, symbol, timeframe, timestamps, *columns
+            )
+            
+            duplicate_count = len(candles) - inserted_count
             
             return inserted_count, duplicate_count
             
@@ -224,21 +278,121 @@ class CCXTHistoricalBackfill:
             self.total_stats["total_errors"] += 1
             return 0, 0
     
-    async def get_existing_data_range(self, symbol: str, timeframe: str) -> Tuple[Optional[int], Optional[int]]:
-        """기존 데이터 범위 조회"""
-        try:
+    async def get_existing_data_range(self, symbol: str, timeframe: str,
+                                      conn: Optional[asyncpg.Connection] = None
+                                      ) -> Tuple[Optional[int], Optional[int], int]:
+        """기존 데이터 범위와 행 수 조회 (conn이 주어지면 해당 연결 사용)"""
+        if conn is None:
             async with self.db_pool.acquire() as conn:
-                result = await conn.fetchrow("""
-                    SELECT MIN(timestamp_ms) as min_ts, MAX(timestamp_ms) as max_ts
-                    FROM trading.candlesticks 
-                    WHERE symbol = $1 AND timeframe = $2
-                """, symbol, timeframe)
-                
-                return result['min_ts'], result['max_ts']
-                
+                return await self.get_existing_data_range(symbol, timeframe, conn)
+        
+        try:
+            result = await conn.fetchrow("""
+                SELECT MIN(timestamp_ms) as min_ts, MAX(timestamp_ms) as max_ts,
+                       COUNT(*) as row_count
+                FROM trading.candlesticks 
+                WHERE symbol = $1 AND timeframe = $2
+            """, symbol, timeframe)
+            
+            return result['min_ts'], result['max_ts'], result['row_count']
+            
         except Exception as e:
             logger.error(f"Failed to get existing data range for {symbol}/{timeframe}: {e}")
-            return None, None
+            return None, None, 0
+    
+    async def get_interior_gaps(self, symbol: str, timeframe: str, conn: asyncpg.Connection,
+                                start_ts: int, end_ts: int,
+                                timeframe_duration_ms: int) -> List[Tuple[int, int]]:
+        """기존 데이터 내부의 빈 구간 조회 (중단된 백필, 백필 전 실시간 적재 등으로 생긴 구멍)"""
+        rows = await conn.fetch(
+            FIND_INTERIOR_GAPS_SQL, symbol, timeframe, start_ts, end_ts, timeframe_duration_ms
+        )
+        return [(row['gap_start'], row['gap_end']) for row in rows]
+    
+    def get_fetch_ranges(self, start_ts: int, end_ts: int, timeframe_duration_ms: int,
+                         existing_min: Optional[int],
+                         existing_max: Optional[int],
+                         interior_gaps: Optional[List[Tuple[int, int]]] = None
+                         ) -> List[Tuple[int, int]]:
+        """조회가 필요한 구간 계산 (기존 데이터 이전/이후 구간 + 내부 빈 구간)"""
+        if not self.skip_existing or existing_min is None or existing_max is None:
+            return [(start_ts, end_ts)]
+        
+        ranges = []
+        if start_ts < existing_min:
+            ranges.append((start_ts, min(existing_min, end_ts)))
+        
+        # 내부 빈 구간은 대상 범위로 잘라서 추가
+        for gap_start, gap_end in interior_gaps or []:
+            gap_start, gap_end = max(gap_start, start_ts), min(gap_end, end_ts)
+            if gap_start < gap_end:
+                ranges.append((gap_start, gap_end))
+        
+        if existing_max + timeframe_duration_ms < end_ts:
+            ranges.append((max(start_ts, existing_max + timeframe_duration_ms), end_ts))
+        
+        return sorted(ranges)
+    
+    async def _fetch_pages(self, symbol: str, timeframe: str, fetch_ranges: List[Tuple[int, int]],
+                           timeframe_duration_ms: int, batch_limit: int,
+                           page_queue: asyncio.Queue):
+        """구간별 OHLCV 페이지를 순서대로 조회하여 큐에 적재 (종료 시 None 전달)"""
+        try:
+            for range_start, range_end in fetch_ranges:
+                current_since = range_start
+                
+                while current_since < range_end:
+                    # 구간 끝을 넘겨 기존 데이터까지 받아오지 않도록 요청 개수 제한
+                    remaining = (range_end - current_since) // timeframe_duration_ms + 1
+                    
+                    # CCXT fetchOHLCV 호출
+                    ohlcv_data = await self.fetch_historical_ohlcv(
+                        symbol, timeframe, current_since, min(batch_limit, remaining)
+                    )
+                    
+                    if not ohlcv_data:
+                        logger.warning(f"No more data for {symbol}/{timeframe} at {current_since}")
+                        break
+                    
+                    await page_queue.put(ohlcv_data)
+                    
+                    # 다음 배치의 시작점 설정 (호출 간격은 CCXT 레이트 리미터가 조절)
+                    last_candle_time = ohlcv_data[-1][0]
+                    current_since = last_candle_time + timeframe_duration_ms
+        finally:
+            await page_queue.put(None)
+    
+    async def _write_pages(self, symbol: str, timeframe: str, page_queue: asyncio.Queue,
+                           progress: BackfillProgress, conn: asyncpg.Connection):
+        """큐에서 페이지를 꺼내 FLUSH_THRESHOLD 단위로 모아 데이터베이스에 삽입"""
+        pending = []
+        
+        while True:
+            ohlcv_data = await page_queue.get()
+            if ohlcv_data is not None:
+                pending.extend(ohlcv_data)
+                if len(pending) < FLUSH_THRESHOLD:
+                    continue
+            
+            if pending:
+                # 모인 페이지를 한 번에 삽입
+                inserted, duplicates = await self.insert_candles_batch(
+                    symbol, timeframe, pending, conn
+                )
+                
+                # 진행 상황과 전체 통계는 배치당 한 번만 갱신
+                progress.total_fetched += len(pending)
+                progress.total_inserted += inserted
+                progress.total_duplicates += duplicates
+                self.total_stats["total_candles_inserted"] += inserted
+                self.total_stats["total_duplicates_skipped"] += duplicates
+                
+                logger.info(f"{symbol}/{timeframe}: fetched {len(pending)}, "
+                           f"inserted {inserted}, duplicates {duplicates}")
+                pending = []
+            
+            if ohlcv_data is None:
+                break
     
     async def backfill_symbol_timeframe(self, symbol: str, timeframe: str, 
                                        days_back: int = 30) -> BackfillProgress:
@@ -258,56 +412,63 @@ class CCXTHistoricalBackfill:
             end_ts = int(end_time.timestamp() * 1000)
             start_ts = int(start_time.timestamp() * 1000)
             
-            # 기존 데이터 범위 확인
-            existing_min, existing_max = await self.get_existing_data_range(symbol, timeframe)
-            
-            logger.info(f"Starting CCXT backfill for {symbol}/{timeframe}")
-            logger.info(f"Target range: {start_time} to {end_time}")
-            if existing_min and existing_max:
-                existing_start = datetime.fromtimestamp(existing_min / 1000)
-                existing_end = datetime.fromtimestamp(existing_max / 1000)
-                logger.info(f"Existing range: {existing_start} to {existing_end}")
-            
-            # CCXT 타임프레임 간격 계산
-            timeframe_duration_ms = self.exchange.parse_timeframe(timeframe) * 1000
-            expected_candles = (end_ts - start_ts) // timeframe_duration_ms
-            progress.total_expected = expected_candles
-            
-            # 페이지네이션을 통한 데이터 수집
-            current_since = start_ts
-            batch_limit = self.timeframe_config.get(timeframe, {}).get("records_per_batch", 1000)
-            
-            while current_since < end_ts:
-                # CCXT fetchOHLCV 호출
-                ohlcv_data = await self.fetch_historical_ohlcv(
-                    symbol, timeframe, current_since, batch_limit
+            # 백필 전체에서 하나의 연결 사용 (배치마다 풀에서 다시 가져오지 않음)
+            async with self.db_pool.acquire() as conn:
+                # 기존 데이터 범위 확인
+                existing_min, existing_max, existing_count = await self.get_existing_data_range(
+                    symbol, timeframe, conn
                 )
                 
-                if not ohlcv_data:
-                    logger.warning(f"No more data for {symbol}/{timeframe} at {current_since}")
-                    break
+                logger.info(f"Starting CCXT backfill for {symbol}/{timeframe}")
+                logger.info(f"Target range: {start_time} to {end_time}")
+                if existing_min and existing_max:
+                    existing_start = datetime.fromtimestamp(existing_min / 1000)
+                    existing_end = datetime.fromtimestamp(existing_max / 1000)
+                    logger.info(f"Existing range: {existing_start} to {existing_end}")
                 
-                # 데이터베이스 삽입
-                inserted, duplicates = await self.insert_candles_batch(
-                    symbol, timeframe, ohlcv_data
-                )
+                # CCXT 타임프레임 간격 계산
+                timeframe_duration_ms = self.exchange.parse_timeframe(timeframe) * 1000
+                expected_candles = (end_ts - start_ts) // timeframe_duration_ms
+                progress.total_expected = expected_candles
                 
-                progress.total_fetched += len(ohlcv_data)
-                progress.total_inserted += inserted
-                progress.total_duplicates += duplicates
+                # 기존 구간의 행 수가 연속 데이터보다 적으면 내부 빈 구간도 조회 대상에 포함
+                interior_gaps = []
+                if self.skip_existing and existing_min is not None and existing_max is not None:
+                    expected_existing = (existing_max - existing_min) // timeframe_duration_ms + 1
+                    if existing_count < expected_existing:
+                        interior_gaps = await self.get_interior_gaps(
+                            symbol, timeframe, conn, start_ts, end_ts, timeframe_duration_ms
+                        )
                 
-                logger.info(f"{symbol}/{timeframe}: fetched {len(ohlcv_data)}, "
-                           f"inserted {inserted}, duplicates {duplicates}")
+                # 기존 데이터 구간은 건너뛰고 나머지 구간만 조회
+                fetch_ranges = self.get_fetch_ranges(
+                    start_ts, end_ts, timeframe_duration_ms, existing_min, existing_max,
+                    interior_gaps
+                )
+                if not fetch_ranges:
+                    logger.info(f"{symbol}/{timeframe} already covers the target range, nothing to fetch")
+                elif fetch_ranges != [(start_ts, end_ts)]:
+                    logger.info(f"{symbol}/{timeframe}: fetching {len(fetch_ranges)} "
+                               f"range(s) outside existing data")
                 
-                # 다음 배치의 시작점 설정
-                if len(ohlcv_data) > 0:
-                    last_candle_time = ohlcv_data[-1][0]
-                    current_since = last_candle_time + timeframe_duration_ms
-                else:
-                    break
+                # 페이지네이션을 통한 데이터 수집 (조회와 삽입을 큐로 연결해 동시에 진행)
+                batch_limit = self.timeframe_config.get(timeframe, {}).get("records_per_batch", 1000)
+                page_queue = asyncio.Queue(maxsize=PAGE_QUEUE_SIZE)
+                
+                fetcher = asyncio.create_task(self._fetch_pages(
+                    symbol, timeframe, fetch_ranges, timeframe_duration_ms,
+                    batch_limit, page_queue
+                ))
+                writer = asyncio.create_task(self._write_pages(
+                    symbol, timeframe, page_queue, progress, conn
+                ))
                 
-                # API 레이트 리미트 준수
-                await asyncio.sleep(self.exchange.rateLimit / 1000)
+                try:
+                    await asyncio.gather(fetcher, writer)
+                except BaseException:
+                    fetcher.cancel()
+                    writer.cancel()
+                    raise
             
             progress.end_time = datetime.now()
             progress.status = "completed"
@@ -329,12 +490,14 @@ class CCXTHistoricalBackfill:
         """심볼의 모든 타임프레임 백필"""
         logger.info(f"Starting CCXT backfill for symbol: {symbol}")
         
-        results = {}
-        for timeframe in timeframes:
-            progress = await self.backfill_symbol_timeframe(symbol, timeframe, days_back)
-            results[timeframe] = progress
-            self.total_stats["timeframes_processed"] += 1
+        # 타임프레임별 백필 동시 실행 (각 작업이 풀에서 개별 연결 사용)
+        progresses = await asyncio.gather(*(
+            self.backfill_symbol_timeframe(symbol, timeframe, days_back)
+            for timeframe in timeframes
+        ))
+        results = dict(zip(timeframes, progresses))
         
+        self.total_stats["timeframes_processed"] += len(timeframes)
         self.total_stats["symbols_processed"] += 1
         return results
     
@@ -382,8 +545,11 @@ class CCXTHistoricalBackfill:
         logger.info(f"Period: {days_back} days back")
         
         try:
-            # 병렬 처리를 위한 세마포어 (동시 2개 심볼)
-            semaphore = asyncio.Semaphore(2)
+            # 병렬 처리를 위한 세마포어 (동시 처리 심볼 수 제한)
+            # 실행 중인 작업이 풀 연결을 기다리며 슬롯만 차지하지 않도록 풀 크기 안에서 제한
+            concurrency = min(len(symbols), self.max_concurrency,
+                              self.pool_size // max(1, len(timeframes)))
+            semaphore = asyncio.Semaphore(max(1, concurrency))
             
             async def process_symbol_with_semaphore(symbol):
                 async with semaphore:
@@ -437,6 +603,10 @@ async def main():
     parser.add_argument("--db-name", default=os.getenv('DB_NAME', 'trading_bot'), help="Database name")
     parser.add_argument("--db-user", default=os.getenv('DB_USER', 'trading_bot'), help="Database user")
     parser.add_argument("--db-password", default=os.getenv('DB_PASSWORD'), help="Database password")
+    parser.add_argument("--concurrency", type=int, default=8,
+                       help="Max concurrent symbol backfills (default: 8)")
+    parser.add_argument("--full-range", action="store_true",
+                       help="Re-fetch the whole range even where data already exists")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be done")
     
     args = parser.parse_args()
@@ -453,7 +623,9 @@ async def main():
         db_name=args.db_name,
         db_user=args.db_user,
         db_password=args.db_password or "trading_bot_password",
-        exchange_id=args.exchange
+        exchange_id=args.exchange,
+        max_concurrency=args.concurrency,
+        skip_existing=not args.full_range
     )
     
     try:
@@ -488,4 +660,6 @@ async def main():
 
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
\ No newline at end of file
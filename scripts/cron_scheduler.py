@@ -56,6 +56,13 @@ def get_current_crontab():
         return []
 
 
+def write_crontab(lines):
+    """크론탭 전체를 한 번에 교체 (실패 시 CalledProcessError/TimeoutExpired 발생)"""
+    crontab_content = '\n'.join(lines) + '\n' if lines else ''
+    subprocess.run(["crontab", "-"], input=crontab_content,
+                   text=True, check=True, timeout=5)
+
+
 def install_cron_job(schedule_time="0 10 * * *", symbols=None, force=False):
     """크론 작업 설치"""
     cron_entry = create_cron_entry(schedule_time, symbols)
@@ -82,20 +89,16 @@ def install_cron_job(schedule_time="0 10 * * *", symbols=None, force=False):
     
     # 크론탭 업데이트
     try:
-        crontab_content = '\n'.join(new_crontab) + '\n'
-        process = subprocess.Popen(["crontab", "-"], 
-                                 stdin=subprocess.PIPE, text=True)
-        process.communicate(input=crontab_content)
+        write_crontab(new_crontab)
         
-        if process.returncode == 0:
-            print("✅ Daily data maintenance cron job installed successfully!")
-            print(f"📅 Schedule: {schedule_time} (every day at 10:00 AM)")
-            print(f"🔧 Command: {cron_entry}")
-            return True
-        else:
-            print("❌ Failed to install cron job")
-            return False
-            
+        print("✅ Daily data maintenance cron job installed successfully!")
+        print(f"📅 Schedule: {schedule_time} (every day at 10:00 AM)")
+        print(f"🔧 Command: {cron_entry}")
+        return True
+        
+    except subprocess.CalledProcessError:
+        print("❌ Failed to install cron job")
+        return False
     except Exception as e:
         print(f"❌ Error installing cron job: {e}")
         return False
@@ -118,18 +121,14 @@ def remove_cron_job():
                   if "daily_data_maintenance.py" not in line]
     
     try:
-        crontab_content = '\n'.join(new_crontab) + '\n' if new_crontab else ''
-        process = subprocess.Popen(["crontab", "-"], 
-                                 stdin=subprocess.PIPE, text=True)
-        process.communicate(input=crontab_content)
+        write_crontab(new_crontab)
         
-        if process.returncode == 0:
-            print(f"✅ Removed {len(maintenance_jobs)} daily data maintenance cron job(s)")
-            return True
-        else:
-            print("❌ Failed to remove cron job")
-            return False
-            
+        print(f"✅ Removed {len(maintenance_jobs)} daily data maintenance cron job(s)")
+        return True
+        
+    except subprocess.CalledProcessError:
+        print("❌ Failed to remove cron job")
+        return False
     except Exception as e:
         print(f"❌ Error removing cron job: {e}")
         return False
@@ -146,18 +145,19 @@ def list_cron_jobs():
     print("📋 Current cron jobs:")
     print("-" * 60)
     
+    # 출력과 데이터 유지보수 작업 수집을 한 번의 순회로 처리
+    maintenance_jobs = []
     for i, job in enumerate(current_crontab, 1):
         if job.strip():
             is_maintenance = "daily_data_maintenance.py" in job
+            if is_maintenance:
+                maintenance_jobs.append(job)
             marker = "🔧" if is_maintenance else "📌"
             print(f"{marker} {i}: {job}")
     
     print("-" * 60)
     
     # 데이터 유지보수 작업 강조
-    maintenance_jobs = [line for line in current_crontab 
-                       if "daily_data_maintenance.py" in line]
-    
     if maintenance_jobs:
         print("\n🔧 Data Maintenance Jobs:")
         for job in maintenance_jobs:
@@ -28,6 +28,11 @@ CREATE INDEX IF NOT EXISTS idx_candlesticks_symbol_timeframe
 CREATE INDEX IF NOT EXISTS idx_candlesticks_timestamp 
     ON candlesticks (timestamp_ms);
 
+-- One row per candle (required by the ON CONFLICT upserts);
+-- INCLUDE (id) lets gap/duplicate scans run as index-only scans
+CREATE UNIQUE INDEX IF NOT EXISTS uq_candlesticks_symbol_timeframe_timestamp
+    ON candlesticks (symbol, timeframe, timestamp_ms) INCLUDE (id);
+
 -- Create function to create monthly partitions
 CREATE OR REPLACE FUNCTION create_monthly_partition(
     base_table_name TEXT,
@@ -45,10 +50,13 @@ BEGIN
     end_date := EXTRACT(EPOCH FROM ((year_month || '_01')::DATE + INTERVAL '1 month')) * 1000;
     
     -- Create partition if it doesn't exist
+    -- (fillfactor 90 leaves page room for HOT updates of in-progress candles;
+    --  storage parameters cannot be set on the partitioned parent itself)
     EXECUTE format('
         CREATE TABLE IF NOT EXISTS %I 
         PARTITION OF %I 
-        FOR VALUES FROM (%L) TO (%L)',
+        FOR VALUES FROM (%L) TO (%L)
+        WITH (fillfactor = 90)',
         partition_name, base_table_name, start_date, end_date
     );
     
@@ -104,6 +112,15 @@ CREATE TABLE IF NOT EXISTS dead_letter_queue (
 -- Create index for DLQ
 CREATE INDEX IF NOT EXISTS idx_dlq_created_at ON dead_letter_queue (created_at);
 
+-- Create daily maintenance cursor table (last verified candle per symbol/timeframe)
+CREATE TABLE IF NOT EXISTS maintenance_cursor (
+    symbol VARCHAR(20) NOT NULL,
+    timeframe VARCHAR(10) NOT NULL,
+    last_verified_ts BIGINT NOT NULL,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (symbol, timeframe)
+);
+
 -- Grant permissions
 GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA trading TO trading_bot;
 GRANT ALL PRIVILEGES ON ALL SEQUENCES IN SCHEMA trading TO trading_bot;
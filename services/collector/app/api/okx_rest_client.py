@@ -7,15 +7,72 @@ import hashlib
 import hmac
 import json
 import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
 import aiohttp
+import numpy as np
+import orjson
 import structlog
+from yarl import URL
 from app.core.config import get_settings
 
 logger = structlog.get_logger(__name__)
 
+# 타임프레임별 캔들 간격 (ms)
+TIMEFRAME_INTERVALS_MS = {
+    "1m": 60 * 1000,
+    "5m": 5 * 60 * 1000,
+    "15m": 15 * 60 * 1000,
+    "1h": 60 * 60 * 1000,
+    "4h": 4 * 60 * 60 * 1000,
+    "1d": 24 * 60 * 60 * 1000,
+}
+
+# 요청당 최대 캔들 수 (OKX 제한)
+MAX_CANDLES_PER_REQUEST = 300
+
+# 범위 조회 시 동시에 진행할 최대 요청 수
+MAX_CONCURRENT_REQUESTS = 5
+
+
+@dataclass(slots=True)
+class CandleBatch:
+    """컬럼 형태의 캔들 배치 (캔들마다 dict를 만들지 않음)"""
+    symbol: str
+    timeframe: str
+    ts: np.ndarray      # int64, (N,)
+    ohlcv: np.ndarray   # float64, (N, 6): open, high, low, close, volume, volume_currency
+    
+    @classmethod
+    def empty(cls, symbol: str, timeframe: str) -> "CandleBatch":
+        """빈 배치 생성"""
+        return cls(symbol, timeframe, np.empty(0, dtype=np.int64), np.empty((0, 6), dtype=np.float64))
+    
+    def __len__(self) -> int:
+        return len(self.ts)
+    
+    def as_records(self) -> List[Dict]:
+        """기존 캔들 dict 형식으로 변환"""
+        return [
+            {
+                "symbol": self.symbol,
+                "timeframe": self.timeframe,
+                "timestamp": ts,
+                "open": open_price,
+                "high": high_price,
+                "low": low_price,
+                "close": close_price,
+                "volume": volume,
+                "volume_currency": volume_currency,
+                "confirm": True,  # 히스토리 데이터는 항상 확정
+                "source": "okx_rest_api"
+            }
+            for ts, (open_price, high_price, low_price, close_price, volume, volume_currency)
+            in zip(self.ts.tolist(), self.ohlcv.tolist())
+        ]
+
 
 class OKXRestClient:
     """OKX REST API 클라이언트 - 히스토리 데이터 수집용"""
@@ -25,26 +82,46 @@ class OKXRestClient:
         self.base_url = "https://www.okx.com" if not self.settings.OKX_SANDBOX else "https://www.okx.com"
         self.session = None
         
+        # 인증 정보는 요청마다 다시 읽지 않도록 미리 변환해 둠
+        self._api_key = self.settings.OKX_API_KEY
+        self._secret = (self.settings.OKX_SECRET_KEY or "").encode("utf-8")
+        self._passphrase = self.settings.OKX_PASSPHRASE or ""
+        self._auth_enabled = bool(self._api_key and self._secret)
+        
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        self._get_session()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        await self.close()
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """커넥션 풀을 사용하는 세션 반환 (없거나 닫혔으면 새로 생성)"""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=20,
+                    limit_per_host=20,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=75
+                ),
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self.session
+    
+    async def close(self):
+        """세션 종료"""
+        if self.session and not self.session.closed:
             await self.session.close()
+        self.session = None
     
     def _generate_signature(self, timestamp: str, method: str, request_path: str, body: str = "") -> str:
         """API 시그니처 생성"""
-        if not all([self.settings.OKX_API_KEY, self.settings.OKX_SECRET_KEY]):
+        if not self._auth_enabled:
             return ""
             
         message = timestamp + method.upper() + request_path + body
-        mac = hmac.new(
-            bytes(self.settings.OKX_SECRET_KEY, encoding='utf8'),
-            bytes(message, encoding='utf-8'),
-            digestmod='sha256'
-        )
-        return mac.digest().hex()
+        return hmac.new(self._secret, message.encode("utf-8"), hashlib.sha256).hexdigest()
     
     def _get_headers(self, method: str, request_path: str, body: str = "") -> Dict[str, str]:
         """API 헤더 생성"""
@@ -55,12 +132,12 @@ class OKXRestClient:
             'OK-ACCESS-TIMESTAMP': timestamp,
         }
         
-        # API 키가 있는 경우에만 인증 헤더 추가
-        if self.settings.OKX_API_KEY:
+        # API 키와 시크릿이 모두 있는 경우에만 인증 헤더 추가
+        if self._auth_enabled:
             headers.update({
-                'OK-ACCESS-KEY': self.settings.OKX_API_KEY,
+                'OK-ACCESS-KEY': self._api_key,
                 'OK-ACCESS-SIGN': self._generate_signature(timestamp, method, request_path, body),
-                'OK-ACCESS-PASSPHRASE': self.settings.OKX_PASSPHRASE or "",
+                'OK-ACCESS-PASSPHRASE': self._passphrase,
             })
         
         return headers
@@ -77,27 +154,15 @@ class OKXRestClient:
         }
         return mapping.get(timeframe, timeframe)
     
-    async def get_candlesticks(
+    async def _fetch_candle_rows(
         self, 
         inst_id: str, 
         timeframe: str, 
         after: Optional[str] = None,
         before: Optional[str] = None,
         limit: int = 100
-    ) -> List[Dict]:
-        """
-        캔들스틱 히스토리 데이터 조회
-        
-        Args:
-            inst_id: 거래 상품 ID (e.g., "BTC-USDT-SWAP")
-            timeframe: 시간 간격 (1m, 5m, 15m, 1h, 4h, 1d)
-            after: 이 시간 이후 데이터 (timestamp ms)
-            before: 이 시간 이전 데이터 (timestamp ms)
-            limit: 조회할 데이터 개수 (최대 300)
-        
-        Returns:
-            캔들스틱 데이터 리스트
-        """
+    ) -> List[List[str]]:
+        """캔들 API 호출 후 원본 행([ts, o, h, l, c, vol, volCcy, ...]) 반환 (실패 시 빈 리스트)"""
         
         okx_timeframe = self._convert_timeframe_to_okx(timeframe)
         
@@ -116,49 +181,30 @@ class OKXRestClient:
         if before:
             params["before"] = str(before)
         
-        # URL 구성
-        query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-        request_path = f"{path}?{query_string}"
-        url = f"{self.base_url}{request_path}"
+        # URL 구성 (서명과 실제 요청에 동일하게 인코딩된 경로 사용)
+        url = URL(self.base_url).with_path(path).with_query(params)
+        request_path = url.path_qs
         
         try:
             headers = self._get_headers("GET", request_path)
             
-            async with self.session.get(url, headers=headers) as response:
+            async with self._get_session().get(url, headers=headers) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await response.json(loads=orjson.loads)
                     
                     if data.get("code") == "0":
-                        candles = data.get("data", [])
-                        
-                        # 데이터 변환
-                        result = []
-                        for candle in candles:
-                            if len(candle) >= 9:
-                                result.append({
-                                    "symbol": inst_id,
-                                    "timeframe": timeframe,
-                                    "timestamp": int(candle[0]),
-                                    "open": float(candle[1]),
-                                    "high": float(candle[2]),
-                                    "low": float(candle[3]),
-                                    "close": float(candle[4]),
-                                    "volume": float(candle[5]),
-                                    "volume_currency": float(candle[6]),
-                                    "confirm": True,  # 히스토리 데이터는 항상 확정
-                                    "source": "okx_rest_api"
-                                })
+                        candles = [candle for candle in data.get("data", []) if len(candle) >= 9]
                         
                         logger.info(
                             "Retrieved historical candles",
                             symbol=inst_id,
                             timeframe=timeframe,
-                            count=len(result),
+                            count=len(candles),
                             after=after,
                             before=before
                         )
                         
-                        return result
+                        return candles
                     
                     else:
                         logger.error(
@@ -188,6 +234,67 @@ class OKXRestClient:
             )
             return []
     
+    async def get_candlesticks(
+        self, 
+        inst_id: str, 
+        timeframe: str, 
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict]:
+        """
+        캔들스틱 히스토리 데이터 조회
+        
+        Args:
+            inst_id: 거래 상품 ID (e.g., "BTC-USDT-SWAP")
+            timeframe: 시간 간격 (1m, 5m, 15m, 1h, 4h, 1d)
+            after: 이 시간 이전 데이터 (timestamp ms, OKX 페이지네이션 기준)
+            before: 이 시간 이후 데이터 (timestamp ms)
+            limit: 조회할 데이터 개수 (최대 300)
+        
+        Returns:
+            캔들스틱 데이터 리스트
+        """
+        candles = await self._fetch_candle_rows(inst_id, timeframe, after, before, limit)
+        
+        return [
+            {
+                "symbol": inst_id,
+                "timeframe": timeframe,
+                "timestamp": int(candle[0]),
+                "open": float(candle[1]),
+                "high": float(candle[2]),
+                "low": float(candle[3]),
+                "close": float(candle[4]),
+                "volume": float(candle[5]),
+                "volume_currency": float(candle[6]),
+                "confirm": True,  # 히스토리 데이터는 항상 확정
+                "source": "okx_rest_api"
+            }
+            for candle in candles
+        ]
+    
+    async def get_candle_batch(
+        self, 
+        inst_id: str, 
+        timeframe: str, 
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        limit: int = 100
+    ) -> CandleBatch:
+        """캔들스틱 히스토리 데이터를 컬럼 배치로 조회 (인자는 get_candlesticks와 동일, 실패 시 빈 배치)"""
+        candles = await self._fetch_candle_rows(inst_id, timeframe, after, before, limit)
+        
+        result = CandleBatch.empty(inst_id, timeframe)
+        if candles:
+            # 문자열 필드를 한 번에 float64 배열로 변환
+            # (ms 타임스탬프는 2^53 미만이므로 float64로 정확히 표현됨)
+            values = np.array([candle[:7] for candle in candles], dtype=np.float64)
+            result.ts = values[:, 0].astype(np.int64)
+            result.ohlcv = values[:, 1:]
+        
+        return result
+    
     async def get_candles_range(
         self,
         inst_id: str,
@@ -211,44 +318,54 @@ class OKXRestClient:
         start_ts = int(start_time.timestamp() * 1000)
         end_ts = int(end_time.timestamp() * 1000)
         
-        all_candles = []
-        current_after = start_ts
+        interval_ms = TIMEFRAME_INTERVALS_MS.get(timeframe)
+        if interval_ms is None:
+            logger.error("Unsupported timeframe", symbol=inst_id, timeframe=timeframe)
+            return []
+        
+        # 요청 하나가 최대 300개를 넘지 않도록 범위를 미리 윈도우로 분할
+        window_ms = MAX_CANDLES_PER_REQUEST * interval_ms
+        windows = [
+            (window_start, min(window_start + window_ms, end_ts))
+            for window_start in range(start_ts, end_ts, window_ms)
+        ]
         
         logger.info(
             "Fetching candle range",
             symbol=inst_id,
             timeframe=timeframe,
             start=start_time.isoformat(),
-            end=end_time.isoformat()
+            end=end_time.isoformat(),
+            windows=len(windows)
         )
         
-        # OKX API는 시간 역순으로 반환하므로 before/after 로직을 사용
-        while current_after < end_ts:
-            candles = await self.get_candlesticks(
-                inst_id=inst_id,
-                timeframe=timeframe,
-                after=str(current_after),
-                before=str(end_ts),
-                limit=300
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        
+        async def fetch_window(window_start: int, window_end: int) -> CandleBatch:
+            # OKX는 after 이전, before 이후 데이터를 반환 -> [window_start, window_end)
+            async with semaphore:
+                return await self.get_candle_batch(
+                    inst_id=inst_id,
+                    timeframe=timeframe,
+                    after=str(window_end),
+                    before=str(window_start - 1),
+                    limit=MAX_CANDLES_PER_REQUEST
+                )
+        
+        batches = await asyncio.gather(
+            *(fetch_window(window_start, window_end) for window_start, window_end in windows)
+        )
+        
+        # 윈도우 배치를 이어 붙인 뒤 np.unique로 정렬 + 경계 중복 제거, dict 변환은 마지막에 한 번만
+        merged = CandleBatch.empty(inst_id, timeframe)
+        if any(len(batch) for batch in batches):
+            ts, first_index = np.unique(
+                np.concatenate([batch.ts for batch in batches]), return_index=True
             )
-            
-            if not candles:
-                break
-            
-            all_candles.extend(candles)
-            
-            # 다음 배치를 위한 타임스탬프 업데이트
-            latest_timestamp = max(candle["timestamp"] for candle in candles)
-            if latest_timestamp <= current_after:
-                break  # 더 이상 새로운 데이터가 없음
-            
-            current_after = latest_timestamp + 1
-            
-            # API 레이트 리미트 방지를 위한 딜레이
-            await asyncio.sleep(0.1)
+            merged.ts = ts
+            merged.ohlcv = np.concatenate([batch.ohlcv for batch in batches])[first_index]
         
-        # 시간 순으로 정렬
-        all_candles.sort(key=lambda x: x["timestamp"])
+        all_candles = merged.as_records()
         
         logger.info(
             "Completed candle range fetch",
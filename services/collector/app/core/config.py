@@ -1,10 +1,10 @@
 """Collector Service Configuration"""
 
-from functools import lru_cache
+import os
 from typing import Optional
 
 from pydantic import Field
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -63,10 +63,13 @@ class Settings(BaseSettings):
     # 심볼 설정 (환경변수로 설정 가능) - 하위 호환성을 위해 유지
     SYMBOL: Optional[str] = Field(default=None, description="Legacy symbol setting")
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
-        extra = "allow"  # 추가 필드 허용
+    # .env는 main.py의 load_dotenv()가 이미 환경 변수로 로드하므로,
+    # ENV_FILE이 지정된 경우에만 설정 생성 시 파일을 다시 읽음
+    model_config = SettingsConfigDict(
+        env_file=os.getenv("ENV_FILE"),
+        case_sensitive=True,
+        extra="allow"  # 추가 필드 허용
+    )
     
     @property
     def websocket_url(self) -> str:
@@ -74,7 +77,13 @@ class Settings(BaseSettings):
         return self.WS_SANDBOX_URL if self.OKX_SANDBOX else self.WS_URL
 
 
-@lru_cache()
+# 모듈 단위 설정 싱글톤 (최초 get_settings() 호출 시 생성)
+_settings: Optional[Settings] = None
+
+
 def get_settings() -> Settings:
     """설정 인스턴스 반환 (캐시됨)"""
-    return Settings()
\ No newline at end of file
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
\ No newline at end of file
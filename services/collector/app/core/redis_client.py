@@ -0,0 +1,46 @@
+"""Redis Connection Pool"""
+
+import redis.asyncio as redis
+from app.core.config import get_settings
+
+# 모든 심볼 컬렉터가 공유하는 커넥션 풀 크기
+MAX_CONNECTIONS = 32
+
+# 풀이 가득 찼을 때 연결 반환을 기다리는 최대 시간 (초)
+POOL_TIMEOUT_SECONDS = 10
+
+_connection_pool: redis.BlockingConnectionPool = None
+
+
+def get_connection_pool() -> redis.BlockingConnectionPool:
+    """공유 Redis 커넥션 풀 반환 (최초 호출 시 생성, 연결은 사용 시점에 열림)
+    
+    캔들 마감 시점에 모든 심볼이 동시에 LPUSH하므로, 풀이 가득 차면 즉시 에러를 내는
+    ConnectionPool 대신 연결 반환을 기다리는 BlockingConnectionPool 사용
+    """
+    global _connection_pool
+
+    if _connection_pool is None:
+        settings = get_settings()
+
+        _connection_pool = redis.BlockingConnectionPool(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            password=settings.REDIS_PASSWORD,
+            decode_responses=True,
+            retry_on_timeout=True,
+            max_connections=MAX_CONNECTIONS,
+            timeout=POOL_TIMEOUT_SECONDS,
+        )
+
+    return _connection_pool
+
+
+async def close_connection_pool():
+    """공유 Redis 커넥션 풀 종료"""
+    global _connection_pool
+
+    if _connection_pool is not None:
+        await _connection_pool.disconnect()
+        _connection_pool = None
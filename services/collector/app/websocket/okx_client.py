@@ -1,20 +1,49 @@
 """OKX WebSocket Client Implementation"""
 
 import asyncio
-import json
+import logging
+import random
 import time
 from datetime import datetime
 from typing import Dict, List, Optional
 
+import orjson
 import redis.asyncio as redis
 import structlog
 import websockets
 from websockets.exceptions import ConnectionClosed, ConnectionClosedError, ConnectionClosedOK
 
 from app.core.config import get_settings
+from app.core.redis_client import get_connection_pool
 
 logger = structlog.get_logger(__name__)
 
+# 컬렉터 상태 Hash 키 (필드: 심볼, 값: 상태 JSON)
+# Hash 필드는 개별 만료가 없으므로 읽는 쪽에서 last_update가 STATUS_TTL_SECONDS보다 오래된 필드를 제외
+STATUS_HASH_KEY = "status"
+STATUS_TTL_SECONDS = 300
+
+# 상태 변경을 병합해 Redis에 쓰는 최소 간격 (초)
+STATUS_FLUSH_INTERVAL = 1.0
+
+# 변경이 없어도 상태를 다시 기록하는 주기 (초) - 살아 있는 컬렉터의 last_update 갱신
+STATUS_HEARTBEAT_INTERVAL = 60
+
+# 수신 대기 프레임 버퍼 크기 (가득 차면 소켓 읽기를 멈춰 백프레셔 적용)
+WS_MAX_QUEUE = 256
+
+# 현재 UTC 시각 ISO 문자열 캐시 (초, 문자열) - 초당 한 번만 포맷팅
+_now_iso_cache = (0, "")
+
+
+def _utc_now_iso() -> str:
+    """현재 UTC 시각의 ISO 문자열 (초 단위로 캐시)"""
+    global _now_iso_cache
+    now = int(time.time())
+    if _now_iso_cache[0] != now:
+        _now_iso_cache = (now, datetime.utcfromtimestamp(now).isoformat())
+    return _now_iso_cache[1]
+
 
 class OKXDataCollector:
     """OKX WebSocket 데이터 컬렉터"""
@@ -24,6 +53,7 @@ class OKXDataCollector:
         self.settings = get_settings()
         self.websocket = None
         self.redis_client = None
+        self._redis_ready = False
         self.is_running = False
         self.is_connected = False
         self.reconnect_count = 0
@@ -33,27 +63,46 @@ class OKXDataCollector:
         self.error_count = 0
         self.subscribed_channels = []
         
+        # 구독 채널명 -> 타임프레임 (예: "candle1H" -> "1H")
+        self._tf_by_channel = {}
+        
+        # 캔들 단위 DEBUG 로그는 레벨이 꺼져 있으면 메시지 포맷팅 자체를 건너뜀
+        self._debug = logging.getLogger(__name__).isEnabledFor(logging.DEBUG)
+        
+        # 상태 기록 (변경 시 dirty 표시, _status_loop가 병합해서 기록)
+        self._status = "initialized"
+        self._status_dirty = asyncio.Event()
+        self._status_task = None
+        
         # 재연결 설정
         self.reconnect_delay = self.settings.INITIAL_RECONNECT_DELAY
         
+        # 연결 후 첫 캔들 수신 여부 (수신 시점에 백오프 리셋)
+        self._received_since_connect = False
+        self.last_success_ts = None
+        self._consecutive_failures = 0
+        
         logger.info(f"Initialized OKX collector for {symbol}")
     
+    def _get_redis_client(self) -> redis.Redis:
+        """Redis 클라이언트 반환 (최초 사용 시 생성, 모든 컬렉터가 커넥션 풀 공유)"""
+        if self.redis_client is None:
+            self.redis_client = redis.Redis(connection_pool=get_connection_pool())
+        return self.redis_client
+    
+    async def _ensure_redis(self):
+        """Redis 연결 확인 (성공할 때까지 한 번만 ping)"""
+        if self._redis_ready:
+            return
+        
+        await self._get_redis_client().ping()
+        self._redis_ready = True
+        logger.info(f"Redis connection established for {self.symbol}")
+    
     async def initialize(self):
-        """컬렉터 초기화"""
+        """컬렉터 초기화 (Redis 연결을 미리 확인하려는 경우에만 호출, run()은 지연 초기화)"""
         try:
-            # Redis 클라이언트 초기화
-            self.redis_client = redis.Redis(
-                host=self.settings.REDIS_HOST,
-                port=self.settings.REDIS_PORT,
-                db=self.settings.REDIS_DB,
-                password=self.settings.REDIS_PASSWORD,
-                decode_responses=True,
-                retry_on_timeout=True
-            )
-            
-            # Redis 연결 테스트
-            await self.redis_client.ping()
-            logger.info(f"Redis connection established for {self.symbol}")
+            await self._ensure_redis()
             
             self.start_time = datetime.utcnow()
             
@@ -66,8 +115,11 @@ class OKXDataCollector:
         try:
             logger.info(f"Connecting to OKX WebSocket for {self.symbol}")
             
+            # OKX 프레임은 작은 JSON이라 permessage-deflate 압축 해제 비용이 대역폭 이득보다 큼
             self.websocket = await websockets.connect(
                 self.settings.websocket_url,
+                compression=None,
+                max_queue=WS_MAX_QUEUE,
                 ping_interval=20,
                 ping_timeout=10,
                 close_timeout=10
@@ -125,10 +177,14 @@ class OKXDataCollector:
             }
             
             # 구독 메시지 전송
-            await self.websocket.send(json.dumps(subscribe_msg))
+            # OKX는 텍스트 프레임을 기대하므로 문자열로 전송
+            await self.websocket.send(orjson.dumps(subscribe_msg).decode())
             
             # OKX 형식으로 변환된 채널명으로 저장
-            self.subscribed_channels = [f"candle{self._convert_timeframe_to_okx_format(tf)}" for tf in timeframes]
+            self.subscribed_channels = [arg["channel"] for arg in subscription_args]
+            self._tf_by_channel = {
+                channel: channel[len("candle"):] for channel in self.subscribed_channels
+            }
             
             logger.info(
                 f"Subscribed to channels for {self.symbol}",
@@ -143,62 +199,91 @@ class OKXDataCollector:
     async def process_message(self, message: str):
         """수신 메시지 처리"""
         try:
-            data = json.loads(message)
+            data = orjson.loads(message)
+            
+            # 대부분의 프레임은 캔들 데이터이므로 먼저 처리
+            if data.get('data'):
+                if not self._received_since_connect:
+                    self._on_first_candle()
+                await self.process_candle_data(data)
+                return
+            
+            event = data.get('event')
             
             # 구독 응답 처리
-            if data.get('event') == 'subscribe':
+            if event == 'subscribe':
                 logger.info(f"Subscription confirmed for {self.symbol}", channel=data.get('arg'))
-                return
             
             # 에러 응답 처리
-            if data.get('event') == 'error':
+            elif event == 'error':
                 logger.error(f"WebSocket error for {self.symbol}", error=data)
                 self.error_count += 1
-                return
-            
-            # 캔들 데이터 처리
-            if 'data' in data and data['data']:
-                await self.process_candle_data(data)
                 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse message for {self.symbol}", error=str(e), message=message[:200])
             self.error_count += 1
         except Exception as e:
             logger.error(f"Failed to process message for {self.symbol}", error=str(e))
             self.error_count += 1
     
+    def _on_first_candle(self):
+        """연결 후 첫 캔들 수신 - 구독까지 정상 동작했으므로 재연결 백오프 리셋"""
+        self._received_since_connect = True
+        self.last_success_ts = time.time()
+        self.reconnect_delay = self.settings.INITIAL_RECONNECT_DELAY
+        self._consecutive_failures = 0
+    
     async def process_candle_data(self, data: Dict):
         """캔들 데이터 처리 및 Redis 큐 전송"""
         try:
             channel_info = data.get('arg', {})
             candle_data_list = data.get('data', [])
             
+            # 채널의 타임프레임은 프레임당 한 번만 조회
+            channel = channel_info.get('channel', '')
+            timeframe = self._tf_by_channel.get(channel)
+            if timeframe is None:
+                timeframe = channel.replace('candle', '')
+            
+            # 프레임 내 캔들을 모아 한 번의 LPUSH로 전송
+            payloads = []
+            received_at = _utc_now_iso()
+            
+            # 루프 안에서 반복되는 속성 조회를 지역 변수로 고정
+            symbol = self.symbol
+            debug = self._debug
+            dumps = orjson.dumps
+            append = payloads.append
+            
             for candle_data in candle_data_list:
                 if len(candle_data) < 9:
                     logger.warning(f"Invalid candle data format for {self.symbol}", data=candle_data)
                     continue
                 
+                # [ts, o, h, l, c, vol, volCcy, volCcyQuote, confirm] 한 번에 분해
+                ts, open_price, high_price, low_price, close_str, volume_str, volume_ccy, _, confirm_status = candle_data[:9]
+                
                 # confirm 필드 확인 - 확정된 캔들("1")만 처리
-                confirm_status = candle_data[8]
                 if confirm_status != "1":
-                    logger.debug(
-                        f"Skipping unconfirmed candle for {self.symbol}",
-                        timeframe=channel_info.get('channel', '').replace('candle', ''),
-                        timestamp=candle_data[0],
-                        confirm=confirm_status
-                    )
+                    if debug:
+                        logger.debug(
+                            f"Skipping unconfirmed candle for {self.symbol}",
+                            timeframe=timeframe,
+                            timestamp=ts,
+                            confirm=confirm_status
+                        )
                     continue
                 
                 # 데이터 검증
-                volume = float(candle_data[5])
-                close_price = float(candle_data[4])
+                volume = float(volume_str)
+                close_price = float(close_str)
                 
                 # Volume이 0이거나 음수인 경우 경고 로그 및 스킵
                 if volume <= 0:
                     logger.warning(
                         f"Invalid volume data for {self.symbol}",
-                        timeframe=channel_info.get('channel', '').replace('candle', ''),
-                        timestamp=candle_data[0],
+                        timeframe=timeframe,
+                        timestamp=ts,
                         volume=volume,
                         close=close_price,
                         confirm=confirm_status
@@ -209,44 +294,46 @@ class OKXDataCollector:
                 if close_price <= 0:
                     logger.warning(
                         f"Invalid price data for {self.symbol}",
-                        timeframe=channel_info.get('channel', '').replace('candle', ''),
-                        timestamp=candle_data[0],
+                        timeframe=timeframe,
+                        timestamp=ts,
                         close=close_price,
                         volume=volume,
                         confirm=confirm_status
                     )
                     continue
                 
-                processed_data = {
-                    "symbol": self.symbol,
-                    "timeframe": channel_info.get('channel', '').replace('candle', ''),
-                    "timestamp": int(candle_data[0]),
-                    "open": float(candle_data[1]),
-                    "high": float(candle_data[2]),
-                    "low": float(candle_data[3]),
-                    "close": close_price,
-                    "volume": volume,
-                    "volume_currency": float(candle_data[6]),
+                timestamp = int(ts)
+                
+                # orjson 바이트를 그대로 저장 (읽는 쪽은 문자열로 디코딩)
+                # 가격/거래량은 OKX 원본 문자열 그대로 전달 (NUMERIC 컬럼에 float 반올림 오차 없이 저장)
+                append(dumps({
+                    "symbol": symbol,
+                    "timeframe": timeframe,
+                    "timestamp": timestamp,
+                    "open": open_price,
+                    "high": high_price,
+                    "low": low_price,
+                    "close": close_str,
+                    "volume": volume_str,
+                    "volume_currency": volume_ccy,
                     "confirm": True,  # 이미 확정된 캔들만 처리하므로 항상 True
-                    "received_at": datetime.utcnow().isoformat(),
+                    "received_at": received_at,
                     "source": "okx_websocket"
-                }
-                
-                # Redis 큐에 전송
-                await self.redis_client.lpush(
-                    "candle_data_queue",
-                    json.dumps(processed_data)
-                )
-                
-                self.message_count += 1
+                }))
                 
-                logger.debug(
-                    f"Processed confirmed candle data for {self.symbol}",
-                    timeframe=processed_data['timeframe'],
-                    close=processed_data['close'],
-                    volume=processed_data['volume'],
-                    timestamp=processed_data['timestamp']
-                )
+                if debug:
+                    logger.debug(
+                        f"Processed confirmed candle data for {self.symbol}",
+                        timeframe=timeframe,
+                        close=close_price,
+                        volume=volume,
+                        timestamp=timestamp
+                    )
+            
+            # Redis 큐에 전송 (LPUSH key v1 v2 ...는 개별 LPUSH와 같은 순서로 적재)
+            if payloads:
+                await self.redis_client.lpush("candle_data_queue", *payloads)
+                self.message_count += len(payloads)
                 
         except Exception as e:
             logger.error(f"Failed to process candle data for {self.symbol}", error=str(e))
@@ -274,11 +361,31 @@ class OKXDataCollector:
             self.is_connected = False
     
     async def update_status(self, status: str):
-        """상태 업데이트"""
+        """상태 업데이트 (실행 중에는 _status_loop가 최대 초당 한 번 기록)"""
+        self._status = status
+        
+        if self._status_task is None or self._status_task.done():
+            await self._write_status()
+        else:
+            self._status_dirty.set()
+    
+    async def _status_loop(self):
+        """변경된 상태를 STATUS_FLUSH_INTERVAL 간격으로 병합하여 기록 (변경이 없으면 하트비트로 기록)"""
+        while self.is_running:
+            try:
+                await asyncio.wait_for(self._status_dirty.wait(), timeout=STATUS_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._status_dirty.clear()
+            await self._write_status()
+            await asyncio.sleep(STATUS_FLUSH_INTERVAL)
+    
+    async def _write_status(self):
+        """현재 상태를 Redis에 기록"""
         try:
             status_data = {
                 "symbol": self.symbol,
-                "status": status,
+                "status": self._status,
                 "is_connected": self.is_connected,
                 "reconnect_count": self.reconnect_count,
                 "last_reconnect": self.last_reconnect.isoformat() if self.last_reconnect else None,
@@ -286,14 +393,14 @@ class OKXDataCollector:
                 "error_count": self.error_count,
                 "subscribed_channels": self.subscribed_channels,
                 "uptime_seconds": int((datetime.utcnow() - self.start_time).total_seconds()) if self.start_time else 0,
-                "last_update": datetime.utcnow().isoformat()
+                "last_update": _utc_now_iso()
             }
             
-            await self.redis_client.set(
-                f"status:{self.symbol}",
-                json.dumps(status_data),
-                ex=300  # 5분 TTL
-            )
+            # 모든 컬렉터 상태를 하나의 Hash에 저장 (조회 시 HGETALL 한 번)
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.hset(STATUS_HASH_KEY, self.symbol, orjson.dumps(status_data))
+                pipe.expire(STATUS_HASH_KEY, STATUS_TTL_SECONDS)  # 모든 컬렉터가 사라지면 Hash 전체 만료
+                await pipe.execute()
             
         except Exception as e:
             logger.error(f"Failed to update status for {self.symbol}", error=str(e))
@@ -310,24 +417,30 @@ class OKXDataCollector:
             "error_count": self.error_count,
             "subscribed_channels": self.subscribed_channels,
             "uptime_seconds": int((datetime.utcnow() - self.start_time).total_seconds()) if self.start_time else 0,
-            "last_update": datetime.utcnow().isoformat()
+            "last_update": _utc_now_iso()
         }
     
     async def run(self):
         """메인 실행 루프"""
         self.is_running = True
+        if self.start_time is None:
+            self.start_time = datetime.utcnow()
+        
+        # 클라이언트 객체만 먼저 만들어 두고 실제 연결 확인은 WebSocket 연결과 병행
+        self._get_redis_client()
+        
+        # 상태 기록은 백그라운드에서 병합 처리
+        self._status_task = asyncio.create_task(self._status_loop())
         
         while self.is_running:
             try:
-                # WebSocket 연결
-                await self.connect_websocket()
+                # Redis 연결 확인과 WebSocket 연결을 동시에 진행
+                await asyncio.gather(self._ensure_redis(), self.connect_websocket())
                 
-                # 기본 채널 구독
+                # 기본 채널 구독 (백오프는 첫 캔들 수신 시 리셋)
+                self._received_since_connect = False
                 await self.subscribe_channels()
                 
-                # 연결 성공 시 재연결 딜레이 리셋
-                self.reconnect_delay = self.settings.INITIAL_RECONNECT_DELAY
-                
                 # 메시지 수신 시작
                 await self.listen_messages()
                 
@@ -354,6 +467,18 @@ class OKXDataCollector:
                 self.reconnect_count += 1
                 self.last_reconnect = datetime.utcnow()
                 
+                # 캔들 수신 없이 연속 실패한 횟수가 상한에 도달하면 중단 (0 = 무제한)
+                self._consecutive_failures += 1
+                max_attempts = self.settings.MAX_RECONNECT_ATTEMPTS
+                if max_attempts and self._consecutive_failures > max_attempts:
+                    logger.error(
+                        f"Giving up reconnecting {self.symbol}",
+                        attempts=self._consecutive_failures - 1
+                    )
+                    self.is_running = False
+                    await self.update_status("failed")
+                    break
+                
                 logger.info(
                     f"Attempting to reconnect {self.symbol}",
                     attempt=self.reconnect_count,
@@ -362,10 +487,10 @@ class OKXDataCollector:
                 
                 await asyncio.sleep(self.reconnect_delay)
                 
-                # 지수 백오프
+                # 지수 백오프 + decorrelated jitter (전체 장애 시 컬렉터들이 동시에 재접속하지 않도록)
                 self.reconnect_delay = min(
-                    self.reconnect_delay * 2,
-                    self.settings.MAX_RECONNECT_DELAY
+                    self.settings.MAX_RECONNECT_DELAY,
+                    random.uniform(self.settings.INITIAL_RECONNECT_DELAY, self.reconnect_delay * 3)
                 )
     
     async def stop(self):
@@ -374,6 +499,15 @@ class OKXDataCollector:
         
         self.is_running = False
         
+        # 상태 기록 중단 (아래 stopped 기록 이후 상태가 다시 기록되지 않도록 먼저 취소)
+        if self._status_task:
+            self._status_task.cancel()
+            try:
+                await self._status_task
+            except asyncio.CancelledError:
+                pass
+            self._status_task = None
+        
         if self.websocket:
             try:
                 await self.websocket.close()
@@ -14,10 +14,16 @@ from datetime import datetime
 import structlog
 from dotenv import load_dotenv
 
+try:
+    import uvloop
+except ImportError:  # uvloop 미설치 환경(Windows 등)에서는 기본 이벤트 루프 사용
+    uvloop = None
+
 # 환경 변수 로드
 load_dotenv()
 
 from app.core.config import get_settings
+from app.core.redis_client import close_connection_pool, get_connection_pool
 from app.websocket.okx_client import OKXDataCollector
 
 # 설정 로드
@@ -55,8 +61,8 @@ async def create_collector_for_symbol(symbol: str):
             logger.warning(f"Collector for {symbol} already exists")
             return
         
+        # Redis 연결 확인은 run()에서 WebSocket 연결과 함께 진행
         collector = OKXDataCollector(symbol)
-        await collector.initialize()
         
         collectors[symbol] = collector
         
@@ -149,13 +155,8 @@ async def health_reporter():
     import redis.asyncio as redis
     
     try:
-        redis_client = redis.Redis(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            db=settings.REDIS_DB,
-            password=settings.REDIS_PASSWORD,
-            decode_responses=True
-        )
+        # 컬렉터와 같은 커넥션 풀 사용
+        redis_client = redis.Redis(connection_pool=get_connection_pool())
         
         while not shutdown_event.is_set():
             try:
@@ -243,9 +244,13 @@ async def main():
             except asyncio.CancelledError:
                 pass
         
+        await close_connection_pool()
+        
         logger.info("OKX Data Collector Service shutdown complete")
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -56,6 +56,113 @@ class TestOKXClient:
             assert collector.redis_client is not None
             mock_client.ping.assert_called_once()
 
+    
+    @pytest.mark.asyncio
+    async def test_multi_candle_message_payloads(self):
+        """Test a multi-candle frame is queued with one LPUSH and raw price strings"""
+        import json
+        from decimal import Decimal
+        from app.websocket.okx_client import OKXDataCollector
+        
+        collector = OKXDataCollector("BTC-USDT")
+        collector.redis_client = AsyncMock()
+        
+        candles = [
+            ["1700000000000", "37000.1", "37050.25", "36990.05", "37010.3", "12.345", "456789.1", "0", "1"],
+            ["1700003600000", "37010.3", "37100", "37000", "37090.7", "0.1", "3709.07", "0", "1"],
+            ["1700007200000", "37090.7", "37095", "37080", "37085", "1", "37085", "0", "0"],  # unconfirmed
+        ]
+        await collector.process_candle_data({"arg": {"channel": "candle1H"}, "data": candles})
+        
+        collector.redis_client.lpush.assert_awaited_once()
+        queue, *payloads = collector.redis_client.lpush.await_args.args
+        assert queue == "candle_data_queue"
+        assert len(payloads) == 2
+        assert collector.message_count == 2
+        assert collector.error_count == 0
+        
+        for candle, payload in zip(candles, payloads):
+            # The processor decodes with json.loads and stores Decimal(str(value))
+            item = json.loads(payload)
+            assert "numeric_str" not in item
+            assert {key: item[key] for key in ("symbol", "timeframe", "timestamp", "confirm")} == {
+                "symbol": "BTC-USDT",
+                "timeframe": "1H",
+                "timestamp": int(candle[0]),
+                "confirm": True,
+            }
+            assert [item[key] for key in ("open", "high", "low", "close", "volume", "volume_currency")] == candle[1:7]
+            assert Decimal(str(item["close"])) == Decimal(candle[4])
+            assert Decimal(str(item["volume"])) == Decimal(candle[5])
+
+
+class TestRedisConnectionPool:
+    """Shared Redis connection pool tests"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_pushes_beyond_pool_size_are_not_lost(self, monkeypatch):
+        """Test LPUSHes beyond the pool size wait for a connection instead of failing"""
+        import asyncio
+        import fakeredis
+        import redis.asyncio as redis
+        from app.core import redis_client as redis_client_module
+        from app.websocket.okx_client import OKXDataCollector
+        
+        monkeypatch.setattr(redis_client_module, "MAX_CONNECTIONS", 4)
+        monkeypatch.setattr(redis_client_module, "_connection_pool", None)
+        pool = redis_client_module.get_connection_pool()
+        
+        # Route the pool's connections to an in-memory server
+        pool.connection_class = fakeredis.aioredis.FakeAsyncRedisConnection
+        pool.connection_kwargs["server"] = fakeredis.FakeServer()
+        
+        candle = ["1700000000000", "1.5", "2", "1", "1.75", "10", "20", "30", "1"]
+        collectors = []
+        for i in range(40):
+            collector = OKXDataCollector(f"SYM{i}-USDT")
+            collector.redis_client = redis.Redis(connection_pool=pool)
+            collectors.append(collector)
+        
+        await asyncio.gather(*(
+            collector.process_candle_data({"arg": {"channel": "candle1H"}, "data": [candle, candle]})
+            for collector in collectors
+        ))
+        
+        assert sum(collector.error_count for collector in collectors) == 0
+        assert await collectors[0].redis_client.llen("candle_data_queue") == 80
+        await pool.disconnect()
+
+
+class TestOKXRestClient:
+    """OKX REST Client tests"""
+    
+    @pytest.mark.asyncio
+    async def test_candles_range_windows(self):
+        """Test range fetch splits into 300-candle windows, dedups and sorts"""
+        from datetime import datetime, timezone
+        import numpy as np
+        from app.api.okx_rest_client import CandleBatch, OKXRestClient
+        
+        client = OKXRestClient()
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        end = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)  # 720 x 1m
+        start_ts = int(start.timestamp() * 1000)
+        
+        async def fake_get_candle_batch(inst_id, timeframe, after=None, before=None, limit=100):
+            # OKX semantics: before < ts < after, newest first
+            lower, upper = int(before) + 1, int(after)
+            timestamps = range(lower - lower % 60000, upper, 60000)
+            ts = np.array([ts for ts in reversed(timestamps) if ts >= lower][:limit], dtype=np.int64)
+            return CandleBatch(inst_id, timeframe, ts, np.ones((len(ts), 6)))
+        
+        with patch.object(client, "get_candle_batch", side_effect=fake_get_candle_batch) as mock_get:
+            candles = await client.get_candles_range("BTC-USDT-SWAP", "1m", start, end)
+        
+        assert mock_get.call_count == 3
+        assert len(candles) == 720
+        assert candles[0]["timestamp"] == start_ts
+        assert all(a["timestamp"] < b["timestamp"] for a, b in zip(candles, candles[1:]))
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
@@ -9,7 +9,7 @@ import logging
 import os
 import time
 from contextlib import asynccontextmanager
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
 import redis.asyncio as redis
@@ -47,6 +47,10 @@ logger = structlog.get_logger(__name__)
 # 서비스 시작 시간 기록
 SERVICE_START_TIME = time.time()
 
+# 컬렉터 상태 Hash 키와 유효 기간 (last_update가 이보다 오래되면 중단된 컬렉터로 간주)
+STATUS_HASH_KEY = "status"
+STATUS_TTL_SECONDS = 300
+
 # Prometheus 메트릭 (중복 등록 방지)
 try:
     REQUESTS_TOTAL = Counter('gateway_requests_total', 'Total requests', ['method', 'endpoint'])
@@ -246,12 +250,22 @@ async def get_symbol_status(symbol: str):
     """심볼별 수집 상태 조회"""
     try:
         # Redis에서 상태 정보 조회
-        status_data = await app.redis.get(f"status:{symbol}")
+        status_data = await app.redis.hget(STATUS_HASH_KEY, symbol)
         if not status_data:
             raise HTTPException(status_code=404, detail="Symbol not found")
         
         status_info = json.loads(status_data)
         
+        # 일정 시간 갱신되지 않았거나 시각이 잘못된 상태는 중단된 컬렉터의 잔여 필드로 보고 제외
+        try:
+            last_update = datetime.fromisoformat(status_info.get("last_update"))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=404, detail="Symbol not found")
+        if last_update.tzinfo is not None:
+            last_update = last_update.astimezone(timezone.utc).replace(tzinfo=None)
+        if last_update < datetime.utcnow() - timedelta(seconds=STATUS_TTL_SECONDS):
+            raise HTTPException(status_code=404, detail="Symbol not found")
+        
         # 기본 응답 구조로 변환
         return StatusResponse(
             symbol=symbol,
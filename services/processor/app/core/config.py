@@ -33,6 +33,7 @@ class Settings(BaseSettings):
     BATCH_SIZE: int = Field(default=100, description="Batch processing size")
     BATCH_TIMEOUT: int = Field(default=5, description="Batch timeout in seconds")
     MAX_RETRIES: int = Field(default=3, description="Max retry attempts")
+    COUNTER_FLUSH_INTERVAL: float = Field(default=1.0, description="Redis counter flush interval in seconds")
     
     # 로깅 설정
     LOG_LEVEL: str = Field(default="INFO", description="Log level")
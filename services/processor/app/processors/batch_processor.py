@@ -2,7 +2,9 @@
 
 import asyncio
 import json
+import time
 from datetime import datetime
+from decimal import Decimal
 from typing import Dict, List
 
 import asyncpg
@@ -13,6 +15,9 @@ from app.core.config import get_settings
 
 logger = structlog.get_logger(__name__)
 
+# 처리율 계산용 초 단위 카운터 버킷 TTL (rate:<counter>:<epoch_sec>)
+RATE_BUCKET_TTL = 120
+
 
 class BatchProcessor:
     """배치 데이터 처리기"""
@@ -23,6 +28,9 @@ class BatchProcessor:
         self.db_pool = None
         self.is_running = False
         
+        # 모니터링 카운터 누적분 (주기적으로 파이프라인으로 반영)
+        self.pending_counters: Dict[str, int] = {}
+        
     async def initialize(self):
         """프로세서 초기화"""
         try:
@@ -150,7 +158,8 @@ class BatchProcessor:
         tasks = [
             asyncio.create_task(self.batch_processor()),
             asyncio.create_task(self.dead_letter_processor()),
-            asyncio.create_task(self.metrics_collector())
+            asyncio.create_task(self.metrics_collector()),
+            asyncio.create_task(self.counter_flusher())
         ]
         
         try:
@@ -265,11 +274,12 @@ class BatchProcessor:
                                 symbol,  # symbol 문자열 직접 사용
                                 timeframe,  # timeframe 문자열 직접 사용
                                 item['timestamp'],  # timestamp_ms로 삽입
-                                float(item['open']),
-                                float(item['high']),
-                                float(item['low']),
-                                float(item['close']),
-                                float(item['volume'])
+                                # 컬렉터는 가격을 문자열로 전달 (이전 float 페이로드도 str()로 동일하게 처리)
+                                Decimal(str(item['open'])),
+                                Decimal(str(item['high'])),
+                                Decimal(str(item['low'])),
+                                Decimal(str(item['close'])),
+                                Decimal(str(item['volume']))
                             ))
                             
                         except Exception as e:
@@ -298,6 +308,7 @@ class BatchProcessor:
                                 insert_data
                             )
                             
+                            self.record_counter("processed_count", len(insert_data))
                             logger.info(f"Processed batch of {len(insert_data)} records")
                             
                         except asyncpg.UndefinedTableError:
@@ -335,6 +346,7 @@ class BatchProcessor:
                     json.dumps(dlq_item)
                 )
             
+            self.record_counter("error_count", len(batch))
             logger.warning(f"Sent {len(batch)} items to DLQ", error=error)
             
         except Exception as e:
@@ -364,6 +376,36 @@ class BatchProcessor:
                 logger.error("DLQ processing error", error=str(e))
                 await asyncio.sleep(5)
     
+    def record_counter(self, name: str, amount: int = 1):
+        """카운터 증가분 누적 (Redis 반영은 counter_flusher가 담당)"""
+        self.pending_counters[name] = self.pending_counters.get(name, 0) + amount
+    
+    async def flush_counters(self):
+        """누적된 카운터 증가분을 하나의 파이프라인으로 Redis에 반영"""
+        if not self.pending_counters:
+            return
+        
+        counters, self.pending_counters = self.pending_counters, {}
+        bucket = int(time.time())
+        
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for name, amount in counters.items():
+                pipe.incrby(name, amount)
+                # 모니터가 서버 측 버킷으로 처리율을 계산할 수 있도록 초 단위 증가분 기록
+                pipe.incrby(f"rate:{name}:{bucket}", amount)
+                pipe.expire(f"rate:{name}:{bucket}", RATE_BUCKET_TTL)
+            await pipe.execute()
+    
+    async def counter_flusher(self):
+        """카운터 주기적 반영 루프"""
+        while self.is_running:
+            try:
+                await asyncio.sleep(self.settings.COUNTER_FLUSH_INTERVAL)
+                await self.flush_counters()
+                
+            except Exception as e:
+                logger.error("Counter flush error", error=str(e))
+    
     async def metrics_collector(self):
         """메트릭 수집"""
         while self.is_running:
@@ -400,6 +442,10 @@ class BatchProcessor:
             await self.db_pool.close()
         
         if self.redis_client:
+            try:
+                await self.flush_counters()
+            except Exception as e:
+                logger.debug(f"Error flushing counters: {e}")
             await self.redis_client.close()
         
         logger.info("Batch processor stopped")
\ No newline at end of file
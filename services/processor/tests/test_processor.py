@@ -1,7 +1,7 @@
 """Processor Service Tests"""
 
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 
 class TestProcessorConfig:
@@ -50,6 +50,34 @@ class TestBatchProcessor:
         assert processor.parse_timeframe_seconds("1D") == 86400
         assert processor.parse_timeframe_seconds("invalid") == 60  # default
     
+    @pytest.mark.asyncio
+    async def test_counter_flush(self):
+        """Test accumulated counters are flushed in one pipeline"""
+        from app.processors.batch_processor import BatchProcessor
+        
+        processor = BatchProcessor()
+        processor.record_counter("processed_count", 100)
+        processor.record_counter("processed_count", 50)
+        processor.record_counter("error_count")
+        
+        mock_pipe = MagicMock()
+        mock_pipe.execute = AsyncMock()
+        mock_pipe.__aenter__ = AsyncMock(return_value=mock_pipe)
+        mock_pipe.__aexit__ = AsyncMock(return_value=False)
+        processor.redis_client = MagicMock()
+        processor.redis_client.pipeline.return_value = mock_pipe
+        
+        await processor.flush_counters()
+        
+        mock_pipe.incrby.assert_any_call("processed_count", 150)
+        mock_pipe.incrby.assert_any_call("error_count", 1)
+        assert any(
+            call.args[0].startswith("rate:processed_count:") and call.args[1] == 150
+            for call in mock_pipe.incrby.call_args_list
+        )
+        mock_pipe.execute.assert_awaited_once()
+        assert processor.pending_counters == {}
+    
     @pytest.mark.asyncio
     async def test_processor_initialization(self):
         """Test processor initialization with mocked dependencies"""
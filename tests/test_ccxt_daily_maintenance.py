@@ -0,0 +1,160 @@
+"""CCXT daily maintenance tests"""
+
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from ccxt_daily_maintenance import CCXTDailyMaintenance, DataGap, MaintenanceStats
+
+SYMBOL = "BTC/USDT"
+TF = 300000  # 5m
+START = 1_700_000_100_000 - 1_700_000_100_000 % TF
+END = START + 299 * TF
+
+
+def make_maintenance(fetched=None):
+    """Maintenance wired to a mocked pool and exchange"""
+    maintenance = CCXTDailyMaintenance()
+    
+    conn = MagicMock()
+    conn.fetchval = AsyncMock(return_value=0)
+    conn.executemany = AsyncMock()
+    maintenance.db_pool = MagicMock()
+    maintenance.db_pool.acquire.return_value.__aenter__.return_value = conn
+    
+    maintenance.exchange = MagicMock()
+    maintenance.exchange.has = {"fetchOHLCV": True}
+    maintenance.exchange.fetch_ohlcv = AsyncMock(side_effect=[fetched or [], []])
+    return maintenance, conn
+
+
+def make_gap(start_ts, end_ts):
+    """Gap over [start_ts, end_ts] for the test symbol"""
+    return DataGap(SYMBOL, "5m", start_ts, end_ts, 300, (end_ts - start_ts) // TF + 1)
+
+
+def candle(ts):
+    """Valid OHLCV row at ts"""
+    return [ts, 1.0, 2.0, 0.5, 1.5, 10.0]
+
+
+class TestFindDataGaps:
+    """Missing timestamp grouping tests"""
+    
+    def test_gaps_at_window_edges(self):
+        """Runs touching the window start and end stay separate gaps"""
+        maintenance = CCXTDailyMaintenance()
+        missing = [START, START + TF, START + 10 * TF, END - TF, END]
+        
+        gaps = maintenance.find_data_gaps(SYMBOL, "5m", TF, missing, START, END)
+        
+        assert [(gap.start_ts, gap.end_ts, gap.missing_count) for gap in gaps] == [
+            (START, START + TF, 2),
+            (START + 10 * TF, START + 10 * TF, 1),
+            (END - TF, END, 2),
+        ]
+        assert all(gap.expected_count == 300 for gap in gaps)
+    
+    def test_whole_window_missing_is_one_gap(self):
+        """A fully empty window is a single gap covering every candle"""
+        maintenance = CCXTDailyMaintenance()
+        missing = list(range(START, END + TF, TF))
+        
+        gaps = maintenance.find_data_gaps(SYMBOL, "5m", TF, missing, START, END)
+        
+        assert [(gap.start_ts, gap.end_ts, gap.missing_count) for gap in gaps] == [(START, END, 300)]
+    
+    def test_no_missing_timestamps(self):
+        """No missing timestamps means no gaps"""
+        maintenance = CCXTDailyMaintenance()
+        
+        assert maintenance.find_data_gaps(SYMBOL, "5m", TF, [], START, END) == []
+
+
+class TestFillDataGaps:
+    """Fetched candle routing tests"""
+    
+    @pytest.mark.asyncio
+    async def test_only_candles_inside_gaps_are_inserted(self):
+        """Candles between, before and after the gaps are dropped, gap edges are kept"""
+        gaps = [make_gap(START + 10 * TF, START + 12 * TF), make_gap(START + 20 * TF, START + 20 * TF)]
+        fetched = [candle(START + i * TF) for i in range(8, 24)]
+        maintenance, conn = make_maintenance(fetched)
+        
+        await maintenance.fill_data_gaps(SYMBOL, "5m", TF, gaps, MaintenanceStats())
+        
+        _, symbol, timeframe, timestamps, *columns = conn.fetchval.await_args.args
+        assert (symbol, timeframe) == (SYMBOL, "5m")
+        assert timestamps == [START + 10 * TF, START + 11 * TF, START + 12 * TF, START + 20 * TF]
+        assert [len(column) for column in columns] == [4] * 5
+    
+    @pytest.mark.asyncio
+    async def test_candles_with_missing_values_are_dropped(self):
+        """Rows with None values inside a gap are not inserted"""
+        gaps = [make_gap(START, START + 2 * TF)]
+        fetched = [candle(START), [START + TF, 1.0, None, 0.5, 1.5, 10.0], candle(START + 2 * TF)]
+        maintenance, conn = make_maintenance(fetched)
+        
+        await maintenance.fill_data_gaps(SYMBOL, "5m", TF, gaps, MaintenanceStats())
+        
+        assert conn.fetchval.await_args.args[3] == [START, START + 2 * TF]
+    
+    @pytest.mark.asyncio
+    async def test_no_candles_in_gaps_skips_insert(self):
+        """Nothing is written when the fetched candles all fall outside the gaps"""
+        gaps = [make_gap(START + 10 * TF, START + 12 * TF)]
+        maintenance, conn = make_maintenance([candle(START + 13 * TF)])
+        
+        assert await maintenance.fill_data_gaps(SYMBOL, "5m", TF, gaps, MaintenanceStats()) == 0
+        conn.fetchval.assert_not_awaited()
+
+
+class TestUpdateCursors:
+    """Maintenance cursor tests"""
+    
+    @pytest.mark.asyncio
+    async def test_cursor_stops_before_first_gap(self):
+        """The cursor never moves past a gap, clean timeframes advance to the window end"""
+        maintenance, conn = make_maintenance()
+        windows = {"5m": (START, END), "1h": (START, END - END % 3600000)}
+        gaps_by_timeframe = {
+            "5m": [make_gap(START + 10 * TF, START + 12 * TF), make_gap(START + 20 * TF, START + 20 * TF)],
+            "1h": [],
+        }
+        
+        await maintenance.update_cursors(SYMBOL, windows, gaps_by_timeframe, MaintenanceStats())
+        
+        cursors = conn.executemany.await_args.args[1]
+        assert cursors == [
+            (SYMBOL, "5m", START + 9 * TF),
+            (SYMBOL, "1h", windows["1h"][1]),
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_cursor_not_updated_after_errors(self, monkeypatch):
+        """A run with errors (e.g. a failed gap fill) leaves the cursor untouched"""
+        maintenance, conn = make_maintenance()
+        windows = {timeframe: (START, END) for timeframe, _ in maintenance.target_timeframes}
+        gaps = {timeframe: [] for timeframe, _ in maintenance.target_timeframes}
+        gaps["5m"] = [make_gap(START + 10 * TF, START + 12 * TF)]
+        
+        async def failing_fill(symbol, timeframe, interval_ms, gaps, stats):
+            stats.total_errors += 1
+            return 0
+        
+        monkeypatch.setattr(maintenance, "get_check_windows", AsyncMock(return_value=windows))
+        monkeypatch.setattr(maintenance, "remove_duplicates", AsyncMock(return_value=0))
+        monkeypatch.setattr(maintenance, "fix_invalid_data", AsyncMock(return_value=0))
+        monkeypatch.setattr(maintenance, "detect_all_gaps", AsyncMock(return_value=gaps))
+        monkeypatch.setattr(maintenance, "fill_data_gaps", failing_fill)
+        update_cursors = AsyncMock()
+        monkeypatch.setattr(maintenance, "update_cursors", update_cursors)
+        
+        stats = await maintenance.check_symbol_integrity(SYMBOL)
+        
+        assert stats.total_errors == 1
+        update_cursors.assert_not_awaited()
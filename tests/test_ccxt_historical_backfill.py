@@ -0,0 +1,62 @@
+"""CCXT historical backfill tests"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from ccxt_historical_backfill import CCXTHistoricalBackfill
+
+TF = 300000  # 5m
+START = 1_700_000_100_000 - 1_700_000_100_000 % TF
+END = START + 1000 * TF
+
+
+class TestGetFetchRanges:
+    """Fetch range planning tests"""
+    
+    def test_no_existing_data_fetches_everything(self):
+        """Without existing rows the whole target range is fetched"""
+        backfill = CCXTHistoricalBackfill()
+        
+        assert backfill.get_fetch_ranges(START, END, TF, None, None) == [(START, END)]
+    
+    def test_full_range_ignores_existing_data(self):
+        """--full-range re-fetches even where data exists"""
+        backfill = CCXTHistoricalBackfill(skip_existing=False)
+        
+        assert backfill.get_fetch_ranges(START, END, TF, START, END) == [(START, END)]
+    
+    def test_only_edges_outside_existing_data(self):
+        """Contiguous existing rows are skipped, both edges are fetched"""
+        backfill = CCXTHistoricalBackfill()
+        existing_min, existing_max = START + 100 * TF, START + 899 * TF
+        
+        ranges = backfill.get_fetch_ranges(START, END, TF, existing_min, existing_max)
+        
+        assert ranges == [(START, existing_min), (existing_max + TF, END)]
+    
+    def test_fully_covered_fetches_nothing(self):
+        """Nothing to fetch when existing rows cover the target range"""
+        backfill = CCXTHistoricalBackfill()
+        
+        assert backfill.get_fetch_ranges(START, END, TF, START, END) == []
+    
+    def test_interior_hole_is_fetched(self):
+        """Holes inside the existing span are fetched as extra ranges"""
+        backfill = CCXTHistoricalBackfill()
+        existing_min, existing_max = START + 100 * TF, START + 899 * TF
+        hole = (START + 400 * TF, START + 450 * TF)
+        
+        ranges = backfill.get_fetch_ranges(START, END, TF, existing_min, existing_max, [hole])
+        
+        assert ranges == [(START, existing_min), hole, (existing_max + TF, END)]
+    
+    def test_interior_hole_clipped_to_target_range(self):
+        """A hole spanning the target start is only fetched from the target start"""
+        backfill = CCXTHistoricalBackfill()
+        hole = (START - 10 * TF, START + 10 * TF)
+        
+        ranges = backfill.get_fetch_ranges(START, END, TF, START - 100 * TF, END, [hole])
+        
+        assert ranges == [(START, START + 10 * TF)]
@@ -0,0 +1,126 @@
+"""Collection monitor tests"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+import fakeredis
+import pytest
+
+import monitor_collection
+from monitor_collection import STATUS_HASH_KEY, CollectionMonitor, decode_statuses
+
+
+def make_monitor(server, socket_timeout=0.2):
+    """Monitor wired to an in-memory Redis server"""
+    monitor = CollectionMonitor()
+    monitor.redis_client = fakeredis.aioredis.FakeRedis(
+        server=server, decode_responses=True, socket_timeout=socket_timeout
+    )
+    return monitor
+
+
+class TestStatusDecoding:
+    """Collector status hash decoding tests"""
+    
+    def test_stale_statuses_are_dropped(self):
+        """Fields not refreshed within the TTL belong to dead collectors"""
+        fresh = datetime.utcnow().isoformat()
+        stale = (datetime.utcnow() - timedelta(seconds=monitor_collection.STATUS_TTL_SECONDS + 1)).isoformat()
+        raw = [
+            "BTC-USDT", f'{{"status": "connected", "last_update": "{fresh}"}}',
+            "ETH-USDT", f'{{"status": "connected", "last_update": "{stale}"}}',
+        ]
+        
+        statuses = decode_statuses(raw)
+        
+        assert list(statuses) == ["BTC-USDT"]
+    
+    def test_bad_entries_are_skipped(self):
+        """Malformed or tz-aware timestamps must not drop the other statuses"""
+        fresh = datetime.utcnow().isoformat()
+        aware = datetime.now(timezone.utc).isoformat()
+        raw = [
+            "BTC-USDT", f'{{"status": "connected", "last_update": "{fresh}"}}',
+            "ETH-USDT", '{"status": "connected", "last_update": "not-a-date"}',
+            "SOL-USDT", f'{{"status": "connected", "last_update": "{aware}"}}',
+            "XRP-USDT", '["not", "an", "object"]',
+            "DOGE-USDT", '{"status": "connected"',
+        ]
+        
+        statuses = decode_statuses(raw)
+        
+        assert list(statuses) == ["BTC-USDT", "SOL-USDT"]
+
+
+class TestKeyspaceWatcher:
+    """Keyspace event subscription tests"""
+    
+    @pytest.mark.asyncio
+    async def test_watcher_survives_idle_longer_than_socket_timeout(self, monkeypatch):
+        """Idle gaps longer than socket_timeout must not end the subscription"""
+        monkeypatch.setattr(monitor_collection, "KEYSPACE_READ_TIMEOUT", 0.1)
+        server = fakeredis.FakeServer()
+        monitor = make_monitor(server, socket_timeout=0.2)
+        publisher = fakeredis.aioredis.FakeRedis(server=server)
+        changed = asyncio.Event()
+        
+        watcher = asyncio.create_task(monitor.watch_keyspace_events(changed))
+        try:
+            await asyncio.sleep(0.6)  # 3x socket_timeout without any event
+            assert not watcher.done()
+            
+            await publisher.publish(f"__keyspace@0__:{STATUS_HASH_KEY}", "hset")
+            await asyncio.wait_for(changed.wait(), timeout=1)
+        finally:
+            watcher.cancel()
+            await asyncio.gather(watcher, return_exceptions=True)
+            await monitor.close()
+            await publisher.aclose()
+
+
+class TestRefreshPacing:
+    """Refresh pacing tests"""
+    
+    @pytest.mark.asyncio
+    async def test_event_refresh_respects_refresh_interval(self):
+        """Continuous keyspace events must not refresh faster than --refresh"""
+        monitor = CollectionMonitor()
+        changed = asyncio.Event()
+        changed.set()
+        watcher = asyncio.create_task(asyncio.sleep(10))
+        
+        try:
+            started = time.monotonic()
+            await monitor.wait_for_next_refresh(0.3, changed, watcher, last_render=started)
+            assert time.monotonic() - started >= 0.3
+        finally:
+            watcher.cancel()
+
+
+class TestKeyspaceConfig:
+    """notify-keyspace-events handling tests"""
+    
+    @pytest.mark.asyncio
+    async def test_config_untouched_without_opt_in(self):
+        """Without opt-in the server setting is never changed"""
+        monitor = CollectionMonitor()
+        monitor.redis_client = AsyncMock()
+        monitor.redis_client.config_get.return_value = {"notify-keyspace-events": ""}
+        
+        assert await monitor.enable_keyspace_notifications() is False
+        monitor.redis_client.config_set.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_config_restored_after_opt_in(self):
+        """Opt-in enables notifications and restores the previous value"""
+        monitor = CollectionMonitor()
+        monitor.redis_client = AsyncMock()
+        monitor.redis_client.config_get.return_value = {"notify-keyspace-events": "E"}
+        
+        assert await monitor.enable_keyspace_notifications(allow_config_set=True) is True
+        monitor.redis_client.config_set.assert_awaited_once_with("notify-keyspace-events", "EKlh")
+        
+        await monitor.restore_keyspace_notifications()
+        monitor.redis_client.config_set.assert_awaited_with("notify-keyspace-events", "E")